@@ -1,6 +1,20 @@
+import hashlib
+import heapq
+import json
+import os
+import pickle
+import re
+import sys
+import tempfile
+import time
 import boto3
 import botocore
+from botocore.config import Config
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone, date
+from functools import lru_cache
+from itertools import chain
 from fpdf import FPDF
 
 # ==========================================
@@ -15,18 +29,41 @@ EXTERNAL_ID = None
 CLIENT_NAME = "Evosus"
 REPORT_TITLE = "Backup Audit Report"
 
+# Concurrent API calls for per-vault recovery point lookups
+MAX_WORKERS = 20
+
+# Enough pooled connections for the thread fan-out, plus adaptive retries
+# so throttled calls back off instead of failing the report
+BOTO_CONFIG = Config(
+    max_pool_connections=MAX_WORKERS,
+    retries={"max_attempts": 10, "mode": "adaptive"},
+    tcp_keepalive=True
+)
+
+# On-disk cache for slow-changing inventory calls (seconds, 0 disables;
+# `--no-cache` on the command line also disables it)
+CACHE_DIR = os.path.expanduser("~/.cache/audit-automation")
+CACHE_TTL = int(os.environ.get("AUDIT_CACHE_TTL", 900))
+
 # Previous month (matches CC report logic)
 _today = date.today()
 _prev_month = _today.month - 1 or 12
 _prev_year = _today.year if _today.month != 1 else _today.year - 1
 REPORT_MONTH_STR = date(_prev_year, _prev_month, 1).strftime("%B %Y")
 
+# Instances tagged by these (e.g. ASG / Karpenter nodes) are not backed up
+EXCLUDE_TAGS = ("autoscaling", "karpenter")
+EXCLUDE_TAGS_RE = re.compile("|".join(EXCLUDE_TAGS), re.IGNORECASE)
+
+# Instance IDs embedded in AMI names (e.g. "AwsBackup_i-0abc123..._...")
+INSTANCE_ID_RE = re.compile(r"i-[0-9a-f]{8,17}")
+
 
 # ==========================================
 # STS ASSUME ROLE
 # ==========================================
 def assume_role(role_arn, session_name, external_id=None):
-    sts_client = boto3.client("sts", region_name=AWS_REGION)
+    sts_client = boto3.client("sts", region_name=AWS_REGION, config=BOTO_CONFIG)
 
     args = {"RoleArn": role_arn, "RoleSessionName": session_name}
     if external_id:
@@ -34,43 +71,75 @@ def assume_role(role_arn, session_name, external_id=None):
 
     creds = sts_client.assume_role(**args)["Credentials"]
 
-    return {
-        "aws_access_key_id": creds["AccessKeyId"],
-        "aws_secret_access_key": creds["SecretAccessKey"],
-        "aws_session_token": creds["SessionToken"]
-    }
+    return boto3.Session(
+        aws_access_key_id=creds["AccessKeyId"],
+        aws_secret_access_key=creds["SecretAccessKey"],
+        aws_session_token=creds["SessionToken"],
+        region_name=AWS_REGION
+    )
 
 
 # ==========================================
 # HELPERS
 # ==========================================
+@lru_cache(maxsize=None)
 def aws_client(service, session):
-    return boto3.client(
-        service,
-        region_name=AWS_REGION,
-        aws_access_key_id=session["aws_access_key_id"],
-        aws_secret_access_key=session["aws_secret_access_key"],
-        aws_session_token=session["aws_session_token"]
-    )
+    # One client per service for the assumed-role session
+    return session.client(service, region_name=AWS_REGION, config=BOTO_CONFIG)
+
 
+def paginate(client, operation, key, **kwargs):
+    """Yield every item under `key` across all pages of a list/describe call."""
+    for page in client.get_paginator(operation).paginate(**kwargs):
+        yield from page.get(key, [])
 
-def aws_resource(service, session):
-    return boto3.resource(
-        service,
-        region_name=AWS_REGION,
-        aws_access_key_id=session["aws_access_key_id"],
-        aws_secret_access_key=session["aws_secret_access_key"],
-        aws_session_token=session["aws_session_token"]
+
+def parse_aws_time(value):
+    """Parse an AWS ISO-8601 timestamp such as '2024-05-01T10:00:00.000Z'."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def cached_paginate(client, operation, key, **kwargs):
+    """paginate() with the collected items cached on disk for CACHE_TTL seconds."""
+    if CACHE_TTL <= 0:
+        return list(paginate(client, operation, key, **kwargs))
+
+    raw_key = json.dumps(
+        [ROLE_ARN, client.meta.region_name, client.meta.service_model.service_name,
+         operation, kwargs],
+        sort_keys=True, default=str
     )
+    path = os.path.join(CACHE_DIR, hashlib.sha256(raw_key.encode()).hexdigest() + ".pkl")
+
+    try:
+        if time.time() - os.path.getmtime(path) < CACHE_TTL:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError):
+        pass
+
+    items = list(paginate(client, operation, key, **kwargs))
+
+    try:
+        os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR)  # created 0600
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(items, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+    return items
 
 
+@lru_cache(maxsize=4096)
 def format_time(dt):
     if not dt:
         return "-"
     if isinstance(dt, str):
         try:
-            dt = datetime.strptime(dt, "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc)
-        except Exception:
+            dt = parse_aws_time(dt)
+        except ValueError:
             return dt
     return dt.strftime("%Y-%m-%d %H:%M:%S UTC")
 
@@ -79,23 +148,29 @@ def format_time(dt):
 # PDF CLASS (MATCHES CLIENTCENTRAL LAYOUT)
 # ==========================================
 class BorderPDF(FPDF):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._page_width = self.w - 2 * self.l_margin
+        self._col_widths = {}  # column count -> equal column widths
+
+        # Same on every page, so build the strings once
+        self._header_text = f"{REPORT_TITLE} - {CLIENT_NAME} - {REPORT_MONTH_STR}"
+        self._footer_text = f"Monthly Audit Report - {REPORT_MONTH_STR}"
+
     def header(self):
-        # Outer border
-        self.set_draw_color(0, 0, 0)
+        # Outer border (draw colour is never changed from the default black)
         self.set_line_width(0.5)
         self.rect(5, 5, 200, 287)
 
         # Dark blue header bar
-        self.set_xy(5, 5)
         self.set_fill_color(0, 51, 102)  # #003366
         self.rect(5, 5, 200, 15, "F")
 
         # Header text (white, centered)
-        header_text = f"{REPORT_TITLE} - {CLIENT_NAME} - {REPORT_MONTH_STR}"
         self.set_text_color(255, 255, 255)
         self.set_font("Arial", "B", 12)
         self.set_xy(5, 7)
-        self.cell(200, 10, header_text, 0, 1, "C")
+        self.cell(200, 10, self._header_text, 0, 1, "C")
 
         # Reset text color
         self.set_text_color(0, 0, 0)
@@ -106,7 +181,7 @@ class BorderPDF(FPDF):
         self.set_y(-13)
         self.set_font("Arial", "I", 9)
         self.set_text_color(120, 120, 120)
-        self.cell(0, 10, f"Monthly Audit Report - {REPORT_MONTH_STR}", 0, 0, "C")
+        self.cell(0, 10, self._footer_text, 0, 0, "C")
 
     # Original table formatting preserved
     def section_title(self, title):
@@ -120,16 +195,27 @@ class BorderPDF(FPDF):
             return
 
         self.set_font("Arial", "B", 10)
-        page_width = self.w - 2 * self.l_margin
-        col_widths = [page_width / len(header)] * len(header)
+        ncols = len(header)
+        col_widths = self._col_widths.get(ncols)
+        if col_widths is None:
+            col_widths = self._col_widths[ncols] = (self._page_width / ncols,) * ncols
 
         # Header row
         for i, col in enumerate(header):
             self.cell(col_widths[i], 7, str(col), 1, 0, "C")
         self.ln()
 
+        # Regular row style; red "no backup" rows switch away from it below
         self.set_font("Arial", "", 10)
+        self.set_text_color(0, 0, 0)
+        prev_red = False
+
+        # Zebra striping: only the filled (light grey) rows use the fill
+        # colour, and FPDF restores it after a page break's header(), so
+        # it is set once rather than per row
+        self.set_fill_color(245, 245, 245)
         fill = False
+        cell = self.cell
 
         for row in data:
             if len(row) < len(header):
@@ -137,22 +223,25 @@ class BorderPDF(FPDF):
             elif len(row) > len(header):
                 row = row[:len(header)]
 
-            if any("no backup" in str(cell).lower() for cell in row):
-                self.set_font("Arial", "I", 10)
-                self.set_text_color(200, 0, 0)
-            else:
-                self.set_font("Arial", "", 10)
-                self.set_text_color(0, 0, 0)
-
-            self.set_fill_color(245, 245, 245 if fill else 255)
+            # Only emit font/colour operators when the row style changes
+            is_red = any("no backup" in str(cell).lower() for cell in row)
+            if is_red != prev_red:
+                if is_red:
+                    self.set_font("Arial", "I", 10)
+                    self.set_text_color(200, 0, 0)
+                else:
+                    self.set_font("Arial", "", 10)
+                    self.set_text_color(0, 0, 0)
+                prev_red = is_red
 
             for i, item in enumerate(row):
-                self.cell(col_widths[i], 6, str(item), 1, 0, "C", fill=fill)
+                cell(col_widths[i], 6, str(item), 1, 0, "C", fill=fill)
 
             self.ln()
             fill = not fill
 
-        self.set_text_color(0, 0, 0)
+        if prev_red:
+            self.set_text_color(0, 0, 0)
         self.ln(3)
 
 
@@ -161,25 +250,32 @@ class BorderPDF(FPDF):
 # ==========================================
 def get_rds_backups(session):
     rds = aws_client("rds", session)
-    clusters = rds.describe_db_clusters().get("DBClusters", [])
+    clusters = cached_paginate(rds, "describe_db_clusters", "DBClusters")
 
     out = []
+    has_backups = False
     for cluster in clusters:
         cid = cluster["DBClusterIdentifier"]
         try:
-            snaps = rds.describe_db_cluster_snapshots(DBClusterIdentifier=cid)["DBClusterSnapshots"]
-            snaps = sorted(snaps, key=lambda x: x["SnapshotCreateTime"], reverse=True)[:5]
+            snaps = paginate(
+                rds, "describe_db_cluster_snapshots", "DBClusterSnapshots",
+                DBClusterIdentifier=cid, PaginationConfig={"PageSize": 100}
+            )
+            snaps = heapq.nlargest(5, snaps, key=lambda x: x["SnapshotCreateTime"])
 
             if snaps:
+                has_backups = True
                 for s in snaps:
                     out.append([s["DBClusterSnapshotIdentifier"], format_time(s["SnapshotCreateTime"])])
             else:
                 out.append([cid, "No backups configured"])
 
         except botocore.exceptions.ClientError as e:
+            # Errors still need the table so they show up in the report
+            has_backups = True
             out.append([cid, f"Error: {e}"])
 
-    return out
+    return out, has_backups
 
 
 # ==========================================
@@ -187,82 +283,109 @@ def get_rds_backups(session):
 # ==========================================
 def get_ec2_backups(session):
     ec2 = aws_client("ec2", session)
-    ec2_res = aws_resource("ec2", session)
-
-    EXCLUDE = ["autoscaling", "karpenter"]
 
     def skip(tags):
-        for t in tags:
-            if any(x in t["Key"].lower() or x in t["Value"].lower() for x in EXCLUDE):
-                return True
-        return False
-
-    instances = []
-    for r in ec2.describe_instances()["Reservations"]:
-        for i in r["Instances"]:
-            if not skip(i.get("Tags", [])):
-                instances.append(i["InstanceId"])
+        return any(
+            EXCLUDE_TAGS_RE.search(t["Key"]) or EXCLUDE_TAGS_RE.search(t["Value"])
+            for t in tags
+        )
+
+    reservations = cached_paginate(ec2, "describe_instances", "Reservations")
+    instances = [
+        i["InstanceId"]
+        for i in chain.from_iterable(r["Instances"] for r in reservations)
+        if not skip(i.get("Tags", []))
+    ]
+
+    now = datetime.now(timezone.utc)
+    six_weeks = now - timedelta(weeks=6)
+
+    # Let EC2 drop older AMIs: one "YYYY-MM-DD*" creation-date wildcard per
+    # day in the window (the exact cut-off is still checked below)
+    creation_days = [
+        (six_weeks + timedelta(days=d)).strftime("%Y-%m-%d*")
+        for d in range((now.date() - six_weeks.date()).days + 1)
+    ]
+
+    # One DescribeImages listing per batch of instances (EC2 allows up to 200
+    # values per filter), grouped by the instance ID found in each AMI name,
+    # instead of one name-filtered call per instance. No owner restriction, so
+    # AMIs shared from other accounts are still listed
+    wanted = set(instances)
+    amis_by_inst = defaultdict(list)
+    for start in range(0, len(instances), 200):
+        for a in paginate(
+            ec2, "describe_images", "Images",
+            Filters=[
+                {"Name": "name", "Values": [f"*{inst}*" for inst in instances[start:start + 200]]},
+                {"Name": "creation-date", "Values": creation_days},
+            ]
+        ):
+            for inst in set(INSTANCE_ID_RE.findall(a.get("Name", ""))) & wanted:
+                amis_by_inst[inst].append(a)
 
     out = []
+    has_backups = False
     for inst in instances:
-        amis = list(ec2_res.images.filter(Filters=[{"Name": "name", "Values": [f"*{inst}*"]}]))
-
-        six_weeks = datetime.now(timezone.utc) - timedelta(weeks=6)
-        recent = [
-            a for a in amis
-            if datetime.strptime(a.creation_date, "%Y-%m-%dT%H:%M:%S.%fZ")
-            .replace(tzinfo=timezone.utc) >= six_weeks
-        ]
-
-        recent = sorted(recent, key=lambda x: x.creation_date, reverse=True)[:5]
+        # Parse each creation date once and reuse it for filtering, ranking and display
+        parsed = ((a, parse_aws_time(a["CreationDate"])) for a in amis_by_inst[inst])
+        recent = heapq.nlargest(
+            5, (p for p in parsed if p[1] >= six_weeks), key=lambda p: p[1]
+        )
 
         if recent:
-            for a in recent:
-                out.append([inst + " (AMI)", a.id, format_time(a.creation_date)])
+            has_backups = True
+            for a, created in recent:
+                out.append([inst + " (AMI)", a["ImageId"], format_time(created)])
         else:
             out.append([inst, "No AMIs / DLM backups configured", "-"])
 
-    return out
+    return out, has_backups
 
 
 # ==========================================
 # EFS BACKUPS
 # ==========================================
-def get_efs_backups(session):
-    sts = aws_client("sts", session)
-    account = sts.get_caller_identity()["Account"]
-
+def get_efs_backups(session, account):
     efs = aws_client("efs", session)
     backup = aws_client("backup", session)
 
-    vaults = backup.list_backup_vaults()["BackupVaultList"]
-    filesystems = efs.describe_file_systems().get("FileSystems", [])
+    vaults = cached_paginate(backup, "list_backup_vaults", "BackupVaultList")
+    filesystems = cached_paginate(efs, "describe_file_systems", "FileSystems")
+
+    def fetch_rps(pair):
+        fs_id, vault_name = pair
+        try:
+            return fs_id, list(paginate(
+                backup, "list_recovery_points_by_backup_vault", "RecoveryPoints",
+                BackupVaultName=vault_name,
+                ByResourceArn=f"arn:aws:elasticfilesystem:{AWS_REGION}:{account}:file-system/{fs_id}"
+            ))
+        except botocore.exceptions.ClientError:
+            return fs_id, []
+
+    fs_ids = [fs["FileSystemId"] for fs in filesystems]
+    pairs = [(fs_id, v["BackupVaultName"]) for fs_id in fs_ids for v in vaults]
+
+    backups = {fs_id: [] for fs_id in fs_ids}
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        for fs_id, rps in ex.map(fetch_rps, pairs):
+            backups[fs_id].extend(rps)
 
     out = []
+    has_backups = False
 
-    for fs in filesystems:
-        fs_id = fs["FileSystemId"]
-        backups = []
-
-        for v in vaults:
-            try:
-                rps = backup.list_recovery_points_by_backup_vault(
-                    BackupVaultName=v["BackupVaultName"],
-                    ByResourceArn=f"arn:aws:elasticfilesystem:{AWS_REGION}:{account}:file-system/{fs_id}"
-                )["RecoveryPoints"]
-                backups.extend(rps)
-            except botocore.exceptions.ClientError:
-                pass
-
-        if backups:
-            recent = sorted(backups, key=lambda x: x["CreationDate"], reverse=True)[:5]
+    for fs_id in fs_ids:
+        if backups[fs_id]:
+            has_backups = True
+            recent = heapq.nlargest(5, backups[fs_id], key=lambda x: x["CreationDate"])
             for b in recent:
                 backup_id = b["RecoveryPointArn"].split(":")[-1]
                 out.append([fs_id, backup_id, format_time(b["CreationDate"])])
         else:
             out.append([fs_id, "No backups configured", "-"])
 
-    return out
+    return out, has_backups
 
 
 # ==========================================
@@ -271,6 +394,20 @@ def get_efs_backups(session):
 def generate_pdf(filename=None):
     print("🔄 Assuming IAM Role for Backup Audit...")
     session = assume_role(ROLE_ARN, SESSION_NAME, EXTERNAL_ID)
+    account = aws_client("sts", session).get_caller_identity()["Account"]
+
+    # Build the clients up front: boto3 sessions are not thread-safe, but
+    # the clients they hand out are, so the sections can then run in parallel
+    for service in ("rds", "ec2", "efs", "backup"):
+        aws_client(service, session)
+
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        rds_future = ex.submit(get_rds_backups, session)
+        ec2_future = ex.submit(get_ec2_backups, session)
+        efs_future = ex.submit(get_efs_backups, session, account)
+        rds, rds_has_backups = rds_future.result()
+        ec2, ec2_has_backups = ec2_future.result()
+        efs, efs_has_backups = efs_future.result()
 
     pdf = BorderPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
@@ -278,8 +415,7 @@ def generate_pdf(filename=None):
 
     # RDS SECTION
     pdf.section_title("RDS Backup Details")
-    rds = get_rds_backups(session)
-    if not rds or all("no backup" in str(r[1]).lower() for r in rds):
+    if not rds_has_backups:
         pdf.set_font("Arial", "I", 10)
         pdf.set_text_color(200, 0, 0)
         pdf.cell(0, 8, "No backups configured for RDS.", 0, 1)
@@ -289,8 +425,7 @@ def generate_pdf(filename=None):
 
     # EC2 SECTION
     pdf.section_title("EC2 Backup Details")
-    ec2 = get_ec2_backups(session)
-    if not ec2 or all("no ami" in str(r[1]).lower() for r in ec2):
+    if not ec2_has_backups:
         pdf.set_font("Arial", "I", 10)
         pdf.set_text_color(200, 0, 0)
         pdf.cell(0, 8, "No backups configured for EC2.", 0, 1)
@@ -300,13 +435,12 @@ def generate_pdf(filename=None):
 
     # EFS SECTION
     pdf.section_title("EFS Backup Details")
-    efs = get_efs_backups(session)
     if not efs:
         pdf.set_font("Arial", "I", 10)
         pdf.set_text_color(200, 0, 0)
         pdf.cell(0, 8, "No EFS file systems detected or no backups found.", 0, 1)
         pdf.set_text_color(0, 0, 0)
-    elif all("no backups" in str(r[1]).lower() for r in efs):
+    elif not efs_has_backups:
         pdf.set_font("Arial", "I", 10)
         pdf.set_text_color(200, 0, 0)
         pdf.cell(0, 8, "No backups configured for EFS.", 0, 1)
@@ -325,4 +459,6 @@ def generate_pdf(filename=None):
 # MAIN
 # ==========================================
 if __name__ == "__main__":
+    if "--no-cache" in sys.argv[1:]:
+        CACHE_TTL = 0
     generate_pdf()
\ No newline at end of file
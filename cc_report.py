@@ -4,12 +4,29 @@ import urllib.parse
 import json
 import datetime
 from datetime import date
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
-from matplotlib.patches import Rectangle
-import boto3
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.graphics.shapes import Drawing
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.pdfgen import canvas
 import textwrap
+from xml.sax.saxutils import escape
 import os
+import calendar
+import fcntl
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+# orjson parses ticket pages several times faster; fall back to stdlib json
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 # Disable SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -23,43 +40,133 @@ ROLE_ARN = "arn:aws:iam::445567102114:role/automation-from-prod"
 SESSION_NAME = "clientcentral-ticket-session"
 EXTERNAL_ID = None
 
+# Assumed-role credentials are reused across runs until shortly before expiry
+CREDS_CACHE_DIR = os.path.expanduser("~/.cache/audit-automation")
+CREDS_EXPIRY_MARGIN = datetime.timedelta(minutes=5)
+
 SECRET_NAME = "ClientCentral/cc-account-token"
 CC_ACCOUNT_ID = 6166
+CC_TICKETS_URL = "https://clientcentral.io/api/v1/tickets.json"
 CLIENT_NAME = "Evosus"
 
-# Layout tuning
-HEADER_HEIGHT = 0.07
-LEFT_MARGIN = 0.03
-RIGHT_MARGIN = 0.03
-TOP_MARGIN = 0.03
-BOTTOM_MARGIN = 0.03
+# Ticket pages requested concurrently per batch
+PAGE_BATCH_SIZE = 8
+
+# Shared HTTP pool so TLS connections are reused across pages; transient
+# errors and rate limiting (429) are retried with backoff
+HTTP = urllib3.PoolManager(
+    maxsize=PAGE_BATCH_SIZE,
+    retries=urllib3.Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+)
+
+# Layout tuning (points)
+PAGE_MARGIN = 25
+HEADER_HEIGHT = 35
+CONTENT_MARGIN = 45
+
+# Pie slice colours (matplotlib's tab20 palette, as in earlier reports)
+PIE_COLORS = [colors.HexColor(c) for c in (
+    "#1f77b4", "#aec7e8", "#ff7f0e", "#ffbb78", "#2ca02c",
+    "#98df8a", "#d62728", "#ff9896", "#9467bd", "#c5b0d5",
+    "#8c564b", "#c49c94", "#e377c2", "#f7b6d2", "#7f7f7f",
+    "#c7c7c7", "#bcbd22", "#dbdb8d", "#17becf", "#9edae5",
+)]
 
 
 # ==========================================
 # STS Assume Role + AWS helper
 # ==========================================
+def _load_cached_creds(path):
+    try:
+        with open(path) as f:
+            creds = json.load(f)
+        expiration = datetime.datetime.fromisoformat(creds["Expiration"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    if expiration - CREDS_EXPIRY_MARGIN <= datetime.datetime.now(datetime.timezone.utc):
+        return None
+    return creds
+
+
+def _save_cached_creds(path, creds):
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=CREDS_CACHE_DIR)  # created 0600
+        with os.fdopen(fd, "w") as f:
+            json.dump(creds, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not cache AWS credentials: {e}")
+
+
+@lru_cache(maxsize=None)
+def sts_client(region):
+    """STS client on the base credentials, reused by every (re-)assume."""
+    import boto3  # deferred: not needed when the cached credentials are valid
+
+    return boto3.client("sts", region_name=region)
+
+
+def _role_credentials(role_arn, session_name, external_id=None, force=False):
+    """AssumeRole credentials (Expiration as ISO-8601), from cache when still valid unless forced."""
+    cache_key = hashlib.sha1(f"{role_arn}|{session_name}|{external_id or ''}".encode()).hexdigest()
+    cache_path = os.path.join(CREDS_CACHE_DIR, f"sts-{cache_key}.json")
+    os.makedirs(CREDS_CACHE_DIR, mode=0o700, exist_ok=True)
+
+    # Hold a lock while checking/refreshing so overlapping runs of this report
+    # don't both call STS
+    with open(f"{cache_path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        creds = None if force else _load_cached_creds(cache_path)
+        if creds is None:
+            sts = sts_client(AWS_REGION)
+            args = {"RoleArn": role_arn, "RoleSessionName": session_name}
+            if external_id:
+                args["ExternalId"] = external_id
+            resp = sts.assume_role(**args)
+            creds = {
+                "AccessKeyId": resp["Credentials"]["AccessKeyId"],
+                "SecretAccessKey": resp["Credentials"]["SecretAccessKey"],
+                "SessionToken": resp["Credentials"]["SessionToken"],
+                "Expiration": resp["Credentials"]["Expiration"].isoformat(),
+            }
+            _save_cached_creds(cache_path, creds)
+
+    return creds
+
+
 def assume_role(role_arn, session_name, external_id=None):
-    sts = boto3.client("sts", region_name=AWS_REGION)
-    args = {"RoleArn": role_arn, "RoleSessionName": session_name}
-    if external_id:
-        args["ExternalId"] = external_id
-    resp = sts.assume_role(**args)
-    creds = resp["Credentials"]
-    return {
-        "aws_access_key_id": creds["AccessKeyId"],
-        "aws_secret_access_key": creds["SecretAccessKey"],
-        "aws_session_token": creds["SessionToken"]
-    }
+    """boto3 Session for the role whose credentials re-assume it before expiry."""
+    import boto3
+    import botocore.session
+    from botocore.credentials import RefreshableCredentials
+
+    def credentials_metadata(creds):
+        return {
+            "access_key": creds["AccessKeyId"],
+            "secret_key": creds["SecretAccessKey"],
+            "token": creds["SessionToken"],
+            "expiry_time": creds["Expiration"],
+        }
 
+    def refresh():
+        # botocore refreshes up to 15 min before expiry, inside the cache margin, so
+        # always re-assume here rather than getting the same expiring creds back
+        return credentials_metadata(_role_credentials(role_arn, session_name, external_id, force=True))
 
-def aws_client(service, session):
-    return boto3.client(
-        service,
-        region_name=AWS_REGION,
-        aws_access_key_id=session["aws_access_key_id"],
-        aws_secret_access_key=session["aws_secret_access_key"],
-        aws_session_token=session["aws_session_token"]
+    botocore_session = botocore.session.get_session()
+    botocore_session._credentials = RefreshableCredentials.create_from_metadata(
+        metadata=credentials_metadata(_role_credentials(role_arn, session_name, external_id)),
+        refresh_using=refresh,
+        method="sts-assume-role"
     )
+    return boto3.Session(botocore_session=botocore_session, region_name=AWS_REGION)
+
+
+@lru_cache(maxsize=None)
+def aws_client(service, session):
+    return session.client(service, region_name=AWS_REGION)
 
 
 def fetch_cc_token(session):
@@ -67,7 +174,7 @@ def fetch_cc_token(session):
     response = sm.get_secret_value(SecretId=SECRET_NAME)
     secret_string = response.get("SecretString", "{}")
     try:
-        secret = json.loads(secret_string)
+        secret = json_loads(secret_string)
     except Exception:
         secret = {"cc-api-token": secret_string}
 
@@ -94,65 +201,136 @@ STATUS_MAPPING = {
 }
 
 
+# Line breaks and tabs in ticket subjects are flattened to spaces
+SUBJECT_TRANSLATION = str.maketrans({"\n": " ", "\r": " ", "\t": " "})
+
+
+# ==========================================
+# Report month
+# ==========================================
+@lru_cache(maxsize=1)
+def previous_month_info():
+    """(month, year, "Month YYYY") of the report month, fixed for the whole run."""
+    today = date.today()
+    previous_month = today.month - 1 or 12
+    year = today.year if today.month != 1 else today.year - 1
+    return previous_month, year, date(year, previous_month, 1).strftime("%B %Y")
+
+
 # ==========================================
 # Fetch previous month tickets
 # ==========================================
+def tickets_base_url(cc_token, ticket_filter):
+    """Tickets URL with every query parameter except `page`."""
+    query_params = {
+        "token": cc_token,
+        "filter": ticket_filter,
+        "select": "id,subject,created_at,status.*",
+    }
+    return f"{CC_TICKETS_URL}?{urllib.parse.urlencode(query_params)}"
+
+
+def fetch_ticket_page(http, base_url, page):
+    """Fetch one page of tickets; returns the ticket list, or None on error."""
+    url = f"{base_url}&page={page}"
+
+    try:
+        # urllib3 transparently decompresses gzip responses
+        resp = http.request("GET", url, headers={"Accept": "application/json", "Accept-Encoding": "gzip"})
+        data = json_loads(resp.data)
+    except Exception as e:
+        print(f"Error fetching data: {e}")
+        return None
+
+    return data.get("data")
+
+
 def fetch_previous_month_tickets(cc_token, cc_account_id):
     tickets_by_status = {name: [] for name in STATUS_MAPPING.values()}
     page = 1
-    http = urllib3.PoolManager()
 
-    today = date.today()
-    previous_month = today.month - 1 or 12
-    year = today.year if today.month != 1 else today.year - 1
+    previous_month, year, _ = previous_month_info()
 
-    while True:
-        query_params = {
-            "token": cc_token,
-            "filter": f"account={cc_account_id}",
-            "select": "id,subject,created_at,status.*",
-            "page": page
-        }
+    # Only ask for the previous month's tickets rather than paging through the
+    # account's whole history (the month check below stays as a safety net)
+    account_filter = f"account={cc_account_id}"
+    last_day = calendar.monthrange(year, previous_month)[1]
+    month_filter = (
+        f"{account_filter};"
+        f"created_at>={year:04d}-{previous_month:02d}-01T00:00:00Z;"
+        f"created_at<={year:04d}-{previous_month:02d}-{last_day:02d}T23:59:59Z"
+    )
+
+    base_url = tickets_base_url(cc_token, month_filter)
+    first_page = fetch_ticket_page(HTTP, base_url, page)
 
-        url = f"https://clientcentral.io/api/v1/tickets.json?{urllib.parse.urlencode(query_params)}"
+    # The created_at range syntax is not documented; if the API rejects it (or it
+    # matches nothing), list the whole account and rely on the month check instead
+    if not first_page:
+        print("Month filter returned no tickets; falling back to the account-only filter")
+        base_url = tickets_base_url(cc_token, account_filter)
+        first_page = fetch_ticket_page(HTTP, base_url, page)
 
-        try:
-            resp = http.request("GET", url, headers={"Accept": "application/json"})
-            data = json.loads(resp.data.decode() if isinstance(resp.data, (bytes, bytearray)) else resp.data)
-        except Exception as e:
-            print(f"Error fetching data: {e}")
-            break
+    def fetch(page_no):
+        return fetch_ticket_page(HTTP, base_url, page_no)
 
-        if not data.get("data"):
-            break
+    # Hot loop below: bind the lookups once
+    status_lookup = STATUS_MAPPING.get
+    bucket_lookup = tickets_by_status.get
 
-        for ticket in data["data"]:
-            created_str = ticket.get("created_at")
-            status = ticket.get("status")
+    def add_tickets(tickets):
+        for ticket in tickets:
+            get = ticket.get
+            created_str = get("created_at")
+            status = get("status")
 
             if not created_str or not status:
                 continue
 
+            # "YYYY-MM-DDTHH:MM:SSZ": only the date fields are needed
             try:
-                created_date = datetime.datetime.strptime(created_str, "%Y-%m-%dT%H:%M:%SZ")
-            except Exception:
+                created_year = int(created_str[0:4])
+                created_month = int(created_str[5:7])
+            except ValueError:
                 continue
 
-            if created_date.month == previous_month and created_date.year == year:
-                status_name = STATUS_MAPPING.get(status.get("id"), f"Unknown Status ID: {status.get('id')}")
-                subject = (ticket.get("subject") or "").replace("\n", " ").strip()
+            if created_month == previous_month and created_year == year:
+                status_id = status.get("id")
+                status_name = status_lookup(status_id) or f"Unknown Status ID: {status_id}"
+                subject = (get("subject") or "").translate(SUBJECT_TRANSLATION).strip()
 
                 if len(subject) > 200:
                     subject = subject[:197] + "..."
 
-                tickets_by_status.setdefault(status_name, []).append({
-                    "id": ticket.get("id"),
+                # Known statuses are pre-seeded; only unknown IDs add a bucket
+                bucket = bucket_lookup(status_name)
+                if bucket is None:
+                    bucket = tickets_by_status[status_name] = []
+
+                bucket.append({
+                    "id": get("id"),
                     "subject": subject,
-                    "created_at": created_date.strftime("%Y-%m-%d"),
+                    "created_at": created_str[:10],
                     "status": status_name
                 })
 
-        page += 1
+    if not first_page:
+        return tickets_by_status
+    add_tickets(first_page)
+    page += 1
+
+    # Remaining pages are fetched PAGE_BATCH_SIZE at a time and processed in
+    # order; the first empty (or failed) page ends the listing
+    done = False
+    with ThreadPoolExecutor(max_workers=PAGE_BATCH_SIZE) as ex:
+        while not done:
+            for tickets in ex.map(fetch, range(page, page + PAGE_BATCH_SIZE)):
+                if not tickets:
+                    done = True
+                    break
+                add_tickets(tickets)
+
+            page += PAGE_BATCH_SIZE
 
     return tickets_by_status
 
@@ -164,167 +342,155 @@ def wrap_text(text, width=70):
     return "\n".join(textwrap.fill(line, width=width) for line in text.splitlines())
 
 
+# ==========================================
+# PDF Class (border + blue header + footer inside border)
+# ==========================================
+class BorderPDF(SimpleDocTemplate):
+    """Portrait page with border, header bar and footer; set `report_month` before build()."""
+    report_month = ""
+
+    def afterPage(self):
+        c: canvas.Canvas = self.canv
+        width, height = A4
+
+        # Outer border
+        c.setLineWidth(1)
+        c.rect(PAGE_MARGIN, PAGE_MARGIN, width - 2 * PAGE_MARGIN, height - 2 * PAGE_MARGIN)
+
+        # Dark blue header bar
+        c.setFillColor("#003366")
+        c.rect(PAGE_MARGIN, height - PAGE_MARGIN - HEADER_HEIGHT,
+               width - 2 * PAGE_MARGIN, HEADER_HEIGHT, fill=1)
+
+        # Header text (white, centered)
+        c.setFont("Helvetica-Bold", 13)
+        c.setFillColor(colors.white)
+        c.drawCentredString(
+            width / 2, height - PAGE_MARGIN - 22,
+            f"Client Central Ticket Status Report — {CLIENT_NAME} — {self.report_month}"
+        )
+
+        # Footer inside border
+        c.setFont("Helvetica", 9)
+        c.setFillColor(colors.grey)
+        c.drawCentredString(width / 2, PAGE_MARGIN + 8, f"Monthly Audit Report — {self.report_month}")
+
+
+def pie_chart(sizes, labels, width, height):
+    """Ticket distribution pie centred in a width x height drawing."""
+    drawing = Drawing(width, height)
+    diameter = min(width, height) * 0.7
+
+    pie = Pie()
+    pie.x = (width - diameter) / 2
+    pie.y = (height - diameter) / 2
+    pie.width = pie.height = diameter
+    pie.data = sizes
+    pie.labels = labels
+    pie.startAngle = 140
+    pie.direction = "anticlockwise"
+    pie.sideLabels = True
+    pie.slices.strokeColor = colors.white
+    pie.slices.fontName = "Helvetica"
+    pie.slices.fontSize = 9
+    for i in range(len(sizes)):
+        pie.slices[i].fillColor = PIE_COLORS[i % len(PIE_COLORS)]
+
+    drawing.add(pie)
+    return drawing
+
+
 # ==========================================
 # PDF Generation
 # ==========================================
 def generate_pdf_with_border_footer(tickets_by_status, output_file="Ticket_Report_Final.pdf"):
 
-    fig = plt.figure(figsize=(8.27, 11.69))
-    fig.subplots_adjust(left=LEFT_MARGIN, right=1 - RIGHT_MARGIN, top=1 - TOP_MARGIN, bottom=BOTTOM_MARGIN)
-
-    # Draw page border
-    ax_border = fig.add_axes([0, 0, 1, 1])
-    ax_border.axis('off')
-    outer = Rectangle(
-        (LEFT_MARGIN, BOTTOM_MARGIN),
-        1 - LEFT_MARGIN - RIGHT_MARGIN,
-        1 - TOP_MARGIN - BOTTOM_MARGIN,
-        transform=fig.transFigure,
-        fill=False,
-        linewidth=1,
-        edgecolor='black'
+    doc = BorderPDF(
+        output_file,
+        pagesize=A4,
+        leftMargin=CONTENT_MARGIN,
+        rightMargin=CONTENT_MARGIN,
+        topMargin=PAGE_MARGIN + HEADER_HEIGHT + 15,
+        bottomMargin=CONTENT_MARGIN
     )
-    ax_border.add_patch(outer)
 
-    # Header bar
-    header_ax = fig.add_axes([LEFT_MARGIN, 1 - TOP_MARGIN - HEADER_HEIGHT,
-                              1 - LEFT_MARGIN - RIGHT_MARGIN, HEADER_HEIGHT])
-    header_ax.axis('off')
-    header_rect = Rectangle((0, 0), 1, 1, transform=header_ax.transAxes, color="#003366")
-    header_ax.add_patch(header_rect)
+    previous_month_str = previous_month_info()[2]
+    doc.report_month = previous_month_str
 
-    today = date.today()
-    previous_month = today.month - 1 or 12
-    year = today.year if today.month != 1 else today.year - 1
-    previous_month_str = datetime.date(year, previous_month, 1).strftime("%B %Y")
+    title_style = ParagraphStyle("Title", fontName="Helvetica-Bold", fontSize=12,
+                                 alignment=1, spaceBefore=6, spaceAfter=8)
+    cell_style = ParagraphStyle("Cell", fontName="Helvetica", fontSize=9, leading=11)
+    elements = []
 
-    title_text = f"Client Central Ticket Status Report — {CLIENT_NAME} — {previous_month_str}"
-    header_ax.text(0.5, 0.52, title_text,
-                   ha='center', va='center', fontsize=14, color='white', weight='bold')
-
-    # Calculate pending tickets
+    # Calculate pending tickets (the list itself is only built for the table)
     pending_statuses = ["On hold", "Awaiting info"]
-    pending_tickets = []
-
-    for status in pending_statuses:
-        pending_tickets.extend(tickets_by_status.get(status, []))
+    pending_count = sum(len(tickets_by_status.get(status, ())) for status in pending_statuses)
 
-    pending_count = len(pending_tickets)
+    # Pie chart data (shared by both layouts)
+    status_counts = {status: len(t_list) for status, t_list in tickets_by_status.items() if t_list}
+    labels = [f"{status} ({count})" for status, count in status_counts.items()]
+    sizes = list(status_counts.values())
 
     # ==========================================
     # CASE 1 — Pending tickets exist
     # ==========================================
     if pending_count > 0:
-        pie_ax = fig.add_axes([0.12, 0.55, 0.76, 0.36])
-        labels = []
-        sizes = []
-        colors_map = plt.cm.tab20.colors
-
-        for status, t_list in tickets_by_status.items():
-            count = len(t_list)
-            if count > 0:
-                labels.append(f"{status} ({count})")
-                sizes.append(count)
-
-        pie_ax.pie(
-            sizes,
-            labels=labels,
-            startangle=140,
-            colors=colors_map,
-            wedgeprops={'edgecolor': 'white'},
-            textprops={'fontsize': 9}
-        )
+        pending_tickets = [t for status in pending_statuses for t in tickets_by_status.get(status, ())]
+
+        elements.append(pie_chart(sizes, labels, doc.width, 300))
 
-        table_ax = fig.add_axes([0.05, 0.22, 0.90, 0.30])
-        table_ax.axis('off')
+        elements.append(Paragraph("Pending Tickets (On hold &amp; Awaiting info)", title_style))
 
+        # Subjects are wrapped in Paragraphs so long ones flow onto extra lines
         table_data = [["Ticket ID", "Subject", "Created Date", "Status"]] + [
-            [t["id"], t["subject"], t["created_at"], t["status"]] for t in pending_tickets
+            [t["id"], Paragraph(escape(t["subject"]), cell_style), t["created_at"], t["status"]]
+            for t in pending_tickets
         ]
 
-        tbl = table_ax.table(cellText=table_data, loc='upper center',
-                             cellLoc='left',
-                             colWidths=[0.12, 0.48, 0.2, 0.2])
-        tbl.auto_set_font_size(False)
-        tbl.set_fontsize(9)
-
-        table_ax.set_title("Pending Tickets (On hold & Awaiting info)", fontsize=12, pad=5)
+        table = Table(
+            table_data,
+            repeatRows=1,
+            colWidths=[doc.width * w for w in (0.12, 0.48, 0.2, 0.2)],
+        )
+        table.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#003366")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, -1), 9),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ]))
+        elements.append(table)
 
     # ==========================================
     # CASE 2 — NO Pending Tickets (NEW PIE CHART)
     # ==========================================
     else:
-        pie_ax = fig.add_axes([0.18, 0.52, 0.65, 0.35])
-        labels = []
-        sizes = []
-        cmap = plt.cm.tab20.colors
-
-        for status, t_list in tickets_by_status.items():
-            count = len(t_list)
-            if count > 0:
-                labels.append(f"{status} ({count})")
-                sizes.append(count)
-
         if sizes:
-            pie_ax.pie(
-                sizes,
-                labels=labels,
-                startangle=140,
-                colors=cmap,
-                wedgeprops={'edgecolor': 'white'},
-                textprops={'fontsize': 9}
-            )
-            pie_ax.set_title(
-                f"Ticket Distribution — {previous_month_str}",
-                fontsize=12, pad=10, weight="bold"
-            )
+            elements.append(Paragraph(f"Ticket Distribution — {previous_month_str}", title_style))
+            elements.append(pie_chart(sizes, labels, doc.width, 300))
         else:
-            pie_ax.text(
-                0.5, 0.5,
+            elements.append(Spacer(1, 120))
+            elements.append(Paragraph(
                 "No tickets found for selected month.",
-                ha='center', va='center',
-                fontsize=12, color="gray"
-            )
-            pie_ax.axis('off')
+                ParagraphStyle("Empty", fontName="Helvetica", fontSize=12,
+                               textColor=colors.grey, alignment=1)
+            ))
+            elements.append(Spacer(1, 120))
 
-        text_ax = fig.add_axes([0.18, 0.27, 0.65, 0.15])
-        text_ax.axis('off')
-
-        text_ax.text(
-            0.5, 0.62,
+        elements.append(Spacer(1, 30))
+        elements.append(Paragraph(
             f"No pending tickets were found for {previous_month_str}.",
-            ha='center', va='center',
-            fontsize=13, weight='bold', color="#0b2545"
-        )
-
-        text_ax.text(
-            0.5, 0.33,
+            ParagraphStyle("NoPending", fontName="Helvetica-Bold", fontSize=13,
+                           textColor=colors.HexColor("#0b2545"), alignment=1, spaceAfter=10)
+        ))
+        elements.append(Paragraph(
             "All tickets are currently in answered/closed/completed states.",
-            ha='center', va='center',
-            fontsize=11, color="#555555"
-        )
-
-    # ------------------------------------------
-    # FOOTER
-    # ------------------------------------------
-    footer_ax = fig.add_axes([
-        LEFT_MARGIN,
-        BOTTOM_MARGIN + 0.005,
-        1 - LEFT_MARGIN - RIGHT_MARGIN,
-        0.03
-    ])
-    footer_ax.axis('off')
-    footer_ax.text(
-        0.5, 0.5,
-        f"Monthly Audit Report — {previous_month_str}",
-        ha="center", va="center",
-        fontsize=9, color="gray"
-    )
+            ParagraphStyle("NoPendingNote", fontName="Helvetica", fontSize=11,
+                           textColor=colors.HexColor("#555555"), alignment=1)
+        ))
 
-    pdf = PdfPages(output_file)
-    pdf.savefig(fig, bbox_inches='tight')
-    pdf.close()
-    plt.close(fig)
+    doc.build(elements)
 
     print(f"✅ Final PDF generated: {output_file}")
 
@@ -1,7 +1,13 @@
 import boto3
+from botocore.config import Config
 import json
 import datetime
+import fcntl
+import hashlib
+import os
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # -----------------------------
 # AWS Configuration
@@ -13,6 +19,10 @@ ROLE_ARN = "arn:aws:iam::445567102114:role/automation-from-prod"   # <<< REQUIRE
 SESSION_NAME = "grafana-token-rotation-session"
 EXTERNAL_ID = None   # if your role requires external ID
 
+# Assumed-role credentials are reused across runs until shortly before expiry
+CREDS_CACHE_DIR = os.path.expanduser("~/.cache/audit-automation")
+CREDS_EXPIRY_MARGIN = datetime.timedelta(minutes=5)
+
 # -----------------------------
 # Grafana Token Config
 # -----------------------------
@@ -21,36 +31,71 @@ SERVICE_ACCOUNT_ID = "38"
 SECRET_NAME = "grafana/service-account-token"
 EXPIRES_IN = 30 * 24 * 60 * 60  # 30 days
 
+# Shared by every client: pooled connections and adaptive retries
+BOTO_CONFIG = Config(max_pool_connections=10, retries={"max_attempts": 10, "mode": "adaptive"})
+
 
 # -----------------------------
 # STS Assume Role
 # -----------------------------
-def assume_role(role_arn, session_name, external_id=None):
-    sts = boto3.client("sts", region_name=AWS_REGION)
-    params = {"RoleArn": role_arn, "RoleSessionName": session_name}
-    if external_id:
-        params["ExternalId"] = external_id
+def _load_cached_creds(path):
+    try:
+        with open(path) as f:
+            creds = json.load(f)
+        expiration = datetime.datetime.fromisoformat(creds["Expiration"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    if expiration - CREDS_EXPIRY_MARGIN <= datetime.datetime.now(datetime.timezone.utc):
+        return None
+    return creds
+
 
-    resp = sts.assume_role(**params)
-    creds = resp["Credentials"]
-    return {
-        "aws_access_key_id": creds["AccessKeyId"],
-        "aws_secret_access_key": creds["SecretAccessKey"],
-        "aws_session_token": creds["SessionToken"]
-    }
+def _save_cached_creds(path, creds):
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=CREDS_CACHE_DIR)  # created 0600
+        with os.fdopen(fd, "w") as f:
+            json.dump(creds, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[WARN] Could not cache AWS credentials: {e}")
+
+
+def assume_role(role_arn, session_name, external_id=None):
+    cache_key = hashlib.sha1(f"{role_arn}|{session_name}|{external_id or ''}".encode()).hexdigest()
+    cache_path = os.path.join(CREDS_CACHE_DIR, f"sts-{cache_key}.json")
+    os.makedirs(CREDS_CACHE_DIR, mode=0o700, exist_ok=True)
+
+    # Hold a lock while checking/refreshing so overlapping runs of this script don't
+    # both call STS (the cache is per session name, so other reports use their own)
+    with open(f"{cache_path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        creds = _load_cached_creds(cache_path)
+        if creds is None:
+            sts = boto3.client("sts", region_name=AWS_REGION)
+            params = {"RoleArn": role_arn, "RoleSessionName": session_name}
+            if external_id:
+                params["ExternalId"] = external_id
+
+            resp = sts.assume_role(**params)
+            creds = dict(resp["Credentials"], Expiration=resp["Credentials"]["Expiration"].isoformat())
+            _save_cached_creds(cache_path, creds)
+
+    # One session for every client, so they share credentials and config
+    return boto3.Session(
+        aws_access_key_id=creds["AccessKeyId"],
+        aws_secret_access_key=creds["SecretAccessKey"],
+        aws_session_token=creds["SessionToken"],
+        region_name=AWS_REGION
+    )
 
 
 # -----------------------------
 # AWS Client Helper
 # -----------------------------
 def aws_client(service, session):
-    return boto3.client(
-        service,
-        region_name=AWS_REGION,
-        aws_access_key_id=session["aws_access_key_id"],
-        aws_secret_access_key=session["aws_secret_access_key"],
-        aws_session_token=session["aws_session_token"]
-    )
+    return session.client(service, region_name=AWS_REGION, config=BOTO_CONFIG)
 
 
 # -----------------------------
@@ -63,7 +108,7 @@ def main():
     grafana = aws_client("grafana", session)
     secrets = aws_client("secretsmanager", session)
 
-    now = datetime.datetime.utcnow()
+    now = datetime.datetime.now(datetime.timezone.utc)
 
     # Step 1: List existing tokens
     tokens = grafana.list_workspace_service_account_tokens(
@@ -74,16 +119,23 @@ def main():
     # Step 2: Delete expired tokens
     expired_tokens = [
         t for t in tokens
-        if t.get("expiresAt") and t["expiresAt"].replace(tzinfo=None) < now
+        if (expires_at := t.get("expiresAt")) and expires_at < now
     ]
 
-    for token in expired_tokens:
-        grafana.delete_workspace_service_account_token(
-            workspaceId=WORKSPACE_ID,
-            serviceAccountId=SERVICE_ACCOUNT_ID,
-            tokenId=token["id"]
-        )
-        print(f"[INFO] Deleted expired token: {token['name']}")
+    # Deletes are independent round-trips, so issue them concurrently
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        futures = {
+            ex.submit(
+                grafana.delete_workspace_service_account_token,
+                workspaceId=WORKSPACE_ID,
+                serviceAccountId=SERVICE_ACCOUNT_ID,
+                tokenId=token["id"]
+            ): token
+            for token in expired_tokens
+        }
+        for future in as_completed(futures):
+            future.result()
+            print(f"[INFO] Deleted expired token: {futures[future]['name']}")
 
     # Step 3: Create new token
     token_name = f"auto-rotated-{now.strftime('%Y%m%d%H%M%S%f')}"
@@ -1,12 +1,18 @@
+import asyncio
 import datetime
+import fcntl
+import hashlib
+import io
 import os
 import re
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeoutError
-from fpdf import FPDF
-from PIL import Image
+import stat
+import sys
+import tempfile
+from fpdf import FPDF, FPDF_VERSION
+# playwright, PIL and boto3 are imported where they are used to keep startup fast
 
 # ===== AWS ROLE + SECRETS MANAGER =====
-import boto3
+from botocore.config import Config
 import json
 
 # ===========================
@@ -17,44 +23,132 @@ SESSION_NAME = "grafana-report-session"
 EXTERNAL_ID = None
 
 AWS_REGION = "us-east-1"
+BOTO_CONFIG = Config(retries={"max_attempts": 10, "mode": "adaptive"})
+
+# Assumed-role credentials are reused across runs until shortly before expiry
+CREDS_CACHE_DIR = os.path.expanduser("~/.cache/audit-automation")
+CREDS_EXPIRY_MARGIN = datetime.timedelta(minutes=5)
+
+# The Grafana token is a long-lived secret, so it is only cached on tmpfs (never on disk) and
+# removed once expired (usable for GRAFANA_TOKEN_TTL minus CREDS_EXPIRY_MARGIN, i.e. 25 minutes)
+GRAFANA_TOKEN_CACHE_DIR = f"/dev/shm/audit-automation-{os.getuid()}"
+GRAFANA_TOKEN_TTL = datetime.timedelta(minutes=30)
+
+
+def _load_cached_creds(path):
+    try:
+        with open(path) as f:
+            creds = json.load(f)
+        expiration = datetime.datetime.fromisoformat(creds["Expiration"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    if expiration - CREDS_EXPIRY_MARGIN <= datetime.datetime.now(datetime.timezone.utc):
+        return None
+    return creds
+
+
+def _save_cached_creds(path, creds):
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))  # created 0600
+        with os.fdopen(fd, "w") as f:
+            json.dump(creds, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Could not write cache file {path}: {e}")
 
 
 def assume_role(role_arn, session_name, external_id=None):
-    sts_client = boto3.client("sts", region_name=AWS_REGION)
+    import boto3
+
+    cache_key = hashlib.sha1(f"{role_arn}|{session_name}|{external_id or ''}".encode()).hexdigest()
+    cache_path = os.path.join(CREDS_CACHE_DIR, f"sts-{cache_key}.json")
+    os.makedirs(CREDS_CACHE_DIR, mode=0o700, exist_ok=True)
+
+    # Hold a lock while checking/refreshing so overlapping runs of this script don't
+    # both call STS (the cache is per session name, so other reports use their own)
+    with open(f"{cache_path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        creds = _load_cached_creds(cache_path)
+        if creds is None:
+            sts_client = boto3.client("sts", region_name=AWS_REGION)
+
+            if external_id:
+                response = sts_client.assume_role(
+                    RoleArn=role_arn,
+                    RoleSessionName=session_name,
+                    ExternalId=external_id
+                )
+            else:
+                response = sts_client.assume_role(
+                    RoleArn=role_arn,
+                    RoleSessionName=session_name
+                )
 
-    if external_id:
-        response = sts_client.assume_role(
-            RoleArn=role_arn,
-            RoleSessionName=session_name,
-            ExternalId=external_id
-        )
-    else:
-        response = sts_client.assume_role(
-            RoleArn=role_arn,
-            RoleSessionName=session_name
-        )
+            creds = dict(response["Credentials"], Expiration=response["Credentials"]["Expiration"].isoformat())
+            _save_cached_creds(cache_path, creds)
+
+    # One session for every client, so they share credentials and config
+    return boto3.Session(
+        aws_access_key_id=creds["AccessKeyId"],
+        aws_secret_access_key=creds["SecretAccessKey"],
+        aws_session_token=creds["SessionToken"],
+        region_name=AWS_REGION
+    )
 
-    creds = response["Credentials"]
 
-    return {
-        "aws_access_key_id": creds["AccessKeyId"],
-        "aws_secret_access_key": creds["SecretAccessKey"],
-        "aws_session_token": creds["SessionToken"]
-    }
+def _grafana_token_cache_dir():
+    """Private tmpfs directory for the token cache, or None when there is none to use."""
+    try:
+        os.mkdir(GRAFANA_TOKEN_CACHE_DIR, mode=0o700)  # no parents: /dev/shm must already exist
+    except FileExistsError:
+        pass
+    except OSError:
+        return None
+    try:
+        st = os.lstat(GRAFANA_TOKEN_CACHE_DIR)
+    except OSError:
+        return None
+    # Refuse a directory someone else created or opened up
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        return None
+    return GRAFANA_TOKEN_CACHE_DIR
 
 
 def fetch_grafana_token(secret_name, session):
-    client = boto3.client(
-        "secretsmanager",
-        region_name=AWS_REGION,
-        aws_access_key_id=session["aws_access_key_id"],
-        aws_secret_access_key=session["aws_secret_access_key"],
-        aws_session_token=session["aws_session_token"]
-    )
+    cache_key = hashlib.sha1(f"{ROLE_ARN}|{secret_name}".encode()).hexdigest()
+    cache_name = f"grafana-token-{cache_key}.json"
+
+    # Earlier versions cached the token under ~/.cache; don't leave it there
+    try:
+        os.unlink(os.path.join(CREDS_CACHE_DIR, cache_name))
+    except OSError:
+        pass
+
+    cache_dir = _grafana_token_cache_dir()
+    cache_path = cache_dir and os.path.join(cache_dir, cache_name)
+
+    if cache_path:
+        cached = _load_cached_creds(cache_path)
+        if cached is not None:
+            return cached["Token"]
+        # Expired or unreadable: remove it rather than leave the token behind
+        try:
+            os.unlink(cache_path)
+        except OSError:
+            pass
+
+    client = session.client("secretsmanager", region_name=AWS_REGION, config=BOTO_CONFIG)
 
     response = client.get_secret_value(SecretId=secret_name)
     data = json.loads(response["SecretString"])
-    return data.get("grafana-api-token")
+    token = data.get("grafana-api-token")
+
+    if token and cache_path:
+        expiration = datetime.datetime.now(datetime.timezone.utc) + GRAFANA_TOKEN_TTL
+        _save_cached_creds(cache_path, {"Token": token, "Expiration": expiration.isoformat()})
+    return token
 # =====================================
 
 
@@ -76,7 +170,15 @@ CLIENT_CONFIG = {
     "environments": ["lou-dev"],
 
     # Output Settings
-    "output_dir": "./screenshots"
+    "output_dir": "./screenshots",
+    "keep_screenshots": os.environ.get("KEEP_SCREENSHOTS") == "1",
+    "jpeg_quality": 85,
+
+    # Playwright browser engine ("firefox" or "chromium"); override with --browser=<name>
+    "browser": "firefox",
+
+    # Dashboards (namespace/environment pairs) captured at the same time
+    "max_concurrent_pages": 4
 }
 
 # ========================
@@ -89,26 +191,44 @@ PREDEFINED_HEADINGS = [
     "lou-dev.evosus.com health Panel"
 ]
 
+# Filename-safe versions of the headings, for KEEP_SCREENSHOTS output
+SANITIZE_RE = re.compile(r"[^a-zA-Z0-9_-]+")
+SANITIZED_HEADINGS = [SANITIZE_RE.sub("_", h) for h in PREDEFINED_HEADINGS]
+
 # ========================
 # CONSTANTS
 # ========================
-ACCEPT_BUTTON_SELECTORS = [
-    'button:has-text("Accept")',
-    'button:has-text("I Accept")',
-    'button:has-text("Accept all")',
-    'button:has-text("Got it")',
-    'button:has-text("Ok")',
-    '[aria-label="accept cookies"]',
-    '.cc-btn.cc-accept',
-    '.cookie-consent button',
-    '#cookie-accept',
-    '[data-testid="cookie-accept"]'
-]
-
 BANNER_SELECTORS = [
     '.cc-window', '.cookie-consent', '#cookie-banner', '[data-testid="cookie-banner"]', '.cookie-popup'
 ]
 
+# Only namespace/environment and the time range vary per dashboard load
+DASHBOARD_URL_TEMPLATE = (
+    f"{CLIENT_CONFIG['grafana_url']}/d/{CLIENT_CONFIG['dashboard_uid']}/{CLIENT_CONFIG['dashboard_slug']}"
+    f"?orgId={CLIENT_CONFIG['org_id']}&var-namespace={{ns}}&var-Environment_Name={{env}}&var-pod_name=All"
+    "&from={f}&to={t}&kiosk=1&tz=UTC"
+)
+
+# Panel loading indicators: ".panel-loading" up to Grafana 8, the loading bar from Grafana 9/10 on
+PANEL_LOADING_SELECTOR = (
+    ".panel-loading, [aria-label='Panel loading bar'], [data-testid='data-testid Panel loading bar']"
+)
+
+# Injected at document start so banners never render (no accept-button probing per page)
+HIDE_CSS = "\n".join(f"{s} {{ display:none !important; }}" for s in BANNER_SELECTORS)
+HIDE_BANNERS_SCRIPT = (
+    "(() => {"
+    "const s = document.createElement('style');"
+    f"s.textContent = {json.dumps(HIDE_CSS)};"
+    "const add = () => (document.head || document.documentElement).appendChild(s);"
+    "document.documentElement ? add() : document.addEventListener('DOMContentLoaded', add);"
+    "})();"
+)
+
+# Requests that never contribute to a panel screenshot
+BLOCKED_RESOURCE_TYPES = {"font", "media", "image"}
+BLOCKED_HOSTS = ("rudderlabs", "rudderstack", "google-analytics", "googletagmanager", "fonts.googleapis", "fonts.gstatic")
+
 # ========================
 # PDF CLASS
 # ========================
@@ -160,129 +280,251 @@ def get_previous_month_range():
 
 
 # ========================
-# MAIN SCRIPT
+# PANEL CAPTURE
 # ========================
-def main():
+async def block_unneeded_requests(route):
+    request = route.request
+    # Grafana's server-side render endpoint returns panel images; let those through
+    is_panel_render = "/render/" in request.url
+    if (request.resource_type in BLOCKED_RESOURCE_TYPES and not is_panel_render) or \
+            any(host in request.url for host in BLOCKED_HOSTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def open_dashboard(context, url, label):
+    """New page on the dashboard URL once its panels have rendered; returns (page, panels)."""
+    from playwright.async_api import TimeoutError as PWTimeoutError
+
+    page = await context.new_page()
+    await page.goto(url, wait_until="domcontentloaded", timeout=120000)
+
+    # Wait for panels to render instead of sleeping a fixed amount: first for the
+    # panel queries to settle, then for no panel to show a loading indicator
+    try:
+        await page.wait_for_load_state("networkidle", timeout=30000)
+    except PWTimeoutError:
+        print(f"⚠️ Network still busy on {label}, checking panel loading indicators")
+    try:
+        await page.wait_for_selector(".panel-container canvas, .panel-content svg", state="attached", timeout=15000)
+        await page.wait_for_function(
+            "sel => document.querySelectorAll(sel).length === 0", arg=PANEL_LOADING_SELECTOR, timeout=15000
+        )
+    except PWTimeoutError:
+        print(f"⚠️ Panels still loading on {label}, capturing anyway")
+
+    # PANEL DETECTION
+    panel_selectors = [".panel-container", ".react-grid-item", "[data-panelid]", ".grafana-panel"]
+    all_panels = []
+
+    for selector in panel_selectors:
+        panels = await page.query_selector_all(selector)
+        if panels:
+            all_panels.extend(panels)
+            break
+
+    if not all_panels:
+        potential_panels = await page.query_selector_all("div[class*='panel']")
+        all_panels = [p for p in potential_panels if await p.bounding_box()]
+
+    return page, all_panels
+
+
+async def capture_panels(page, panels, ns, env, month_name):
+    """Screenshot the dashboard's panels; returns [(heading, jpeg_bytes)]."""
+    from playwright.async_api import TimeoutError as PWTimeoutError
+
+    captures = []
+    # Sequential: panels share the page's scroll position
+    for i, panel in enumerate(panels):
+        try:
+            await panel.scroll_into_view_if_needed()
+
+            # Panels below the fold only query once scrolled into view: wait for this
+            # panel's own content before the layout check and screenshot
+            try:
+                await panel.wait_for_selector("canvas, svg", state="attached", timeout=10000)
+                await page.wait_for_function(
+                    "([el, sel]) => !el.querySelector(sel)", arg=[panel, PANEL_LOADING_SELECTOR], timeout=10000
+                )
+            except PWTimeoutError:
+                print(f"⚠️ Panel {i+1} on {ns}.{env} still loading, capturing anyway")
 
-    print("🔄 Assuming IAM role…")
-    session = assume_role(ROLE_ARN, SESSION_NAME, EXTERNAL_ID)
+            await panel.wait_for_element_state("stable")
 
-    CLIENT_CONFIG["service_token"] = fetch_grafana_token("grafana/service-account-token", session)
-    print("🔐 Loaded Grafana API token using assumed role.")
+            box = await panel.bounding_box()
+            if not box:
+                continue
 
-    os.makedirs(CLIENT_CONFIG["output_dir"], exist_ok=True)
-    from_epoch, to_epoch, month_name = get_previous_month_range()
+            heading = PREDEFINED_HEADINGS[i] if i < len(PREDEFINED_HEADINGS) else f"Panel_{i+1}"
+            img_bytes = await panel.screenshot(type="jpeg", quality=CLIENT_CONFIG["jpeg_quality"])
+            captures.append((heading, img_bytes))
 
+            if CLIENT_CONFIG["keep_screenshots"]:
+                sanitized = SANITIZED_HEADINGS[i] if i < len(SANITIZED_HEADINGS) else heading
+                img_path = (
+                    f"{CLIENT_CONFIG['output_dir']}/{CLIENT_CONFIG['client_name']}_{month_name}"
+                    f"_{ns}_{env}_{sanitized}.jpg"
+                )
+                with open(img_path, "wb") as f:
+                    f.write(img_bytes)
+                print(f"✅ Saved: {img_path}")
+            else:
+                print(f"✅ Captured: {ns}.{env} {heading}")
+
+        except Exception as e:
+            print(f"❌ Error screenshot panel {i+1}: {e}")
+
+    return captures
+
+
+async def capture_environment(context, ns, env, from_epoch, to_epoch, month_name, semaphore):
+    """Screenshot every panel of one namespace/environment; returns [(heading, jpeg_bytes)]."""
+    url = DASHBOARD_URL_TEMPLATE.format(ns=ns, env=env, f=from_epoch, t=to_epoch)
+    label = f"{ns}.{env}"
+
+    # One page per dashboard: every extra load would re-run all of its panel queries
+    async with semaphore:
+        print(f"🚀 Processing {label} for {month_name}")
+        page, panels = await open_dashboard(context, url, label)
+        try:
+            return await capture_panels(page, panels, ns, env, month_name)
+        finally:
+            await page.close()
+
+
+async def capture_all_environments(from_epoch, to_epoch, month_name):
+    """Capture every namespace/environment concurrently; results keep config order."""
     preset_cookies = [
         {"name": "cookieconsent_status", "value": "dismiss", "url": CLIENT_CONFIG["grafana_url"]},
     ]
 
-    pdf = BorderPDF(unit="mm", format="A4")
-    pdf.report_month = month_name
-    pdf.set_auto_page_break(auto=True, margin=15)
+    from playwright.async_api import async_playwright
 
-    with sync_playwright() as p:
-        browser = p.firefox.launch(headless=True)
+    async with async_playwright() as p:
+        browser = await getattr(p, CLIENT_CONFIG["browser"]).launch(headless=True)
 
-        context = browser.new_context(
-            viewport={"width": 1920, "height": 1080},
+        context = await browser.new_context(
+            # Panels are well under full-HD width; a smaller surface means less to raster per page
+            viewport={"width": 1400, "height": 900},
+            device_scale_factor=1,
             extra_http_headers={"Authorization": f"Bearer {CLIENT_CONFIG['service_token']}"}
         )
-        context.add_cookies(preset_cookies)
-        page = context.new_page()
-
-        # ===== TITLE PAGE =====
-        pdf.add_page()
-        pdf.ln(20)
-
-        # ===== LOOP ENVIRONMENTS =====
-        for ns in CLIENT_CONFIG["namespaces"]:
-            for env in CLIENT_CONFIG["environments"]:
-                url = (
-                    f"{CLIENT_CONFIG['grafana_url']}/d/{CLIENT_CONFIG['dashboard_uid']}/{CLIENT_CONFIG['dashboard_slug']}"
-                    f"?orgId={CLIENT_CONFIG['org_id']}&var-namespace={ns}&var-Environment_Name={env}&var-pod_name=All"
-                    f"&from={from_epoch}&to={to_epoch}&kiosk=1&tz=UTC"
-                )
-
-                print(f"🚀 Processing {ns}.{env} for {month_name}")
-                page.goto(url, wait_until="networkidle", timeout=120000)
-
-                accepted = False
-                for sel in ACCEPT_BUTTON_SELECTORS:
-                    try:
-                        page.wait_for_selector(sel, timeout=5000)
-                        page.click(sel)
-                        accepted = True
-                        break
-                    except:
-                        pass
-
-                if not accepted:
-                    hide_css = "\n".join([f"{s} {{ display:none !important; }}" for s in BANNER_SELECTORS])
-                    page.add_style_tag(content=hide_css)
+        await context.add_cookies(preset_cookies)
+        await context.add_init_script(HIDE_BANNERS_SCRIPT)
+        await context.route("**/*", block_unneeded_requests)
 
-                page.wait_for_timeout(2500)
+        semaphore = asyncio.Semaphore(CLIENT_CONFIG["max_concurrent_pages"])
+        results = await asyncio.gather(*[
+            capture_environment(context, ns, env, from_epoch, to_epoch, month_name, semaphore)
+            for ns in CLIENT_CONFIG["namespaces"]
+            for env in CLIENT_CONFIG["environments"]
+        ])
 
-                # PANEL DETECTION
-                panel_selectors = [".panel-container", ".react-grid-item", "[data-panelid]", ".grafana-panel"]
-                all_panels = []
+        await browser.close()
 
-                for selector in panel_selectors:
-                    panels = page.query_selector_all(selector)
-                    if panels:
-                        all_panels.extend(panels)
-                        break
+    return [capture for env_captures in results for capture in env_captures]
 
-                if not all_panels:
-                    potential_panels = page.query_selector_all("div[class*='panel']")
-                    all_panels = [p for p in potential_panels if p.bounding_box()]
 
-                # SCREENSHOTS
-                for i, panel in enumerate(all_panels):
-                    try:
-                        panel.scroll_into_view_if_needed()
-                        page.wait_for_timeout(800)
+# ========================
+# PDF ASSEMBLY
+# ========================
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# fpdf2 embeds images from memory; PyFPDF 1.x only reads image files
+FPDF_ACCEPTS_STREAMS = int(FPDF_VERSION.split(".")[0]) >= 2
+
+
+def image_size(img_bytes):
+    # PNG width/height sit in the IHDR chunk (bytes 16-24); PIL only parses the header for JPEGs
+    if img_bytes[:8] != PNG_SIGNATURE:
+        from PIL import Image
+
+        with Image.open(io.BytesIO(img_bytes)) as image:
+            return image.size
+    return int.from_bytes(img_bytes[16:20], "big"), int.from_bytes(img_bytes[20:24], "big")
+
+
+def add_panel_image(pdf, heading, img_bytes, seen, spill_dir):
+    # Identical screenshots (repeated panels/headings) share one bytes object and size lookup;
+    # fpdf2 keys in-memory images by content hash and PyFPDF by file name, so either way the
+    # PDF stores one image stream for them
+    digest = hashlib.blake2b(img_bytes, digest_size=16).digest()
+    if digest not in seen:
+        if FPDF_ACCEPTS_STREAMS:
+            image_path = None
+        else:
+            # PyFPDF picks the decoder from the extension: .jpg for the JPEG screenshots
+            suffix = ".png" if img_bytes[:8] == PNG_SIGNATURE else ".jpg"
+            image_path = os.path.join(spill_dir, digest.hex() + suffix)
+            with open(image_path, "wb") as f:
+                f.write(img_bytes)
+        seen[digest] = (img_bytes, image_size(img_bytes), image_path)
+    img_bytes, (width, height), image_path = seen[digest]
+
+    # IMAGE SIZING
+
+    a4_width_mm, a4_height_mm = 200, 277
+    width_mm = width * 25.4 / 96
+    height_mm = height * 25.4 / 96
+    scale = min((a4_width_mm - 20) / width_mm, (a4_height_mm - 40) / height_mm)
+    width_mm *= scale
+    height_mm *= scale
+
+    if pdf.get_y() + height_mm + 40 > 280:
+        pdf.add_page()
 
-                        box = panel.bounding_box()
-                        if not box:
-                            continue
+    # Heading
+    pdf.set_font("Arial", "B", 13)
+    pdf.multi_cell(0, 10, heading, align="C")
+    pdf.ln(5)
 
-                        heading = PREDEFINED_HEADINGS[i] if i < len(PREDEFINED_HEADINGS) else f"Panel_{i+1}"
-                        sanitized = re.sub(r"[^a-zA-Z0-9_-]+", "_", heading)
-                        img_path = f"{CLIENT_CONFIG['output_dir']}/{CLIENT_CONFIG['client_name']}_{month_name}_{sanitized}.png"
+    x_offset = (210 - width_mm) / 2
+    y_start = pdf.get_y()
+    pdf.image(image_path or io.BytesIO(img_bytes), x=x_offset, y=y_start, w=width_mm, h=height_mm)
 
-                        panel.screenshot(path=img_path)
-                        print(f"✅ Saved: {img_path}")
+    pdf.set_y(y_start + height_mm + 10)
 
-                        # IMAGE SIZING
-                        image = Image.open(img_path)
-                        width, height = image.size
 
-                        a4_width_mm, a4_height_mm = 200, 277
-                        width_mm = width * 25.4 / 96
-                        height_mm = height * 25.4 / 96
-                        scale = min((a4_width_mm - 20) / width_mm, (a4_height_mm - 40) / height_mm)
-                        width_mm *= scale
-                        height_mm *= scale
+# ========================
+# MAIN SCRIPT
+# ========================
+def main():
 
-                        if pdf.get_y() + height_mm + 40 > 280:
-                            pdf.add_page()
+    print("🔄 Assuming IAM role…")
+    session = assume_role(ROLE_ARN, SESSION_NAME, EXTERNAL_ID)
 
-                        # Heading
-                        pdf.set_font("Arial", "B", 13)
-                        pdf.multi_cell(0, 10, heading, align="C")
-                        pdf.ln(5)
+    CLIENT_CONFIG["service_token"] = fetch_grafana_token("grafana/service-account-token", session)
+    print("🔐 Loaded Grafana API token using assumed role.")
 
-                        x_offset = (210 - width_mm) / 2
-                        y_start = pdf.get_y()
-                        pdf.image(img_path, x=x_offset, y=y_start, w=width_mm, h=height_mm)
+    os.makedirs(CLIENT_CONFIG["output_dir"], exist_ok=True)
+    from_epoch, to_epoch, month_name = get_previous_month_range()
 
-                        pdf.set_y(y_start + height_mm + 10)
+    captures = asyncio.run(capture_all_environments(from_epoch, to_epoch, month_name))
 
-                    except Exception as e:
-                        print(f"❌ Error screenshot panel {i+1}: {e}")
+    pdf = BorderPDF(unit="mm", format="A4")
+    pdf.report_month = month_name
+    pdf.set_auto_page_break(auto=True, margin=15)
 
-        browser.close()
+    # ===== TITLE PAGE =====
+    pdf.add_page()
+    pdf.ln(20)
+
+    seen = {}
+    added = 0
+    # Only used when the installed FPDF cannot take in-memory images
+    with tempfile.TemporaryDirectory() as spill_dir:
+        for heading, img_bytes in captures:
+            try:
+                add_panel_image(pdf, heading, img_bytes, seen, spill_dir)
+                added += 1
+            except Exception as e:
+                print(f"❌ Error adding panel {heading}: {e}")
+
+        # Don't hand an empty report to the combine step as if it had succeeded
+        if captures and not added:
+            sys.exit(f"❌ None of the {len(captures)} captured panels could be added to the PDF")
 
         pdf_out = os.path.join(
             CLIENT_CONFIG["output_dir"],
@@ -290,8 +532,13 @@ def main():
         )
 
         pdf.output(pdf_out)
-        print(f"✅ Monitoring report created: {pdf_out}")
+    print(f"✅ Monitoring report created: {pdf_out} ({len(seen)} unique images for {len(captures)} panels)")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    for arg in sys.argv[1:]:
+        if arg.startswith("--browser="):
+            CLIENT_CONFIG["browser"] = arg.split("=", 1)[1]
+    if CLIENT_CONFIG["browser"] not in ("firefox", "chromium"):
+        sys.exit(f"❌ Unsupported browser: {CLIENT_CONFIG['browser']}")
+    main()
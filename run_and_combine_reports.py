@@ -1,9 +1,8 @@
 #!/usr/bin/env python3
 import os
 import subprocess
-import time
-from PyPDF2 import PdfMerger
-import boto3
+from concurrent.futures import ThreadPoolExecutor
+# pypdf and boto3 are imported inside the merge/upload steps, after the reports have run
 
 # ================================================================
 # CONFIGURATION
@@ -30,6 +29,11 @@ PDF_OUTPUTS = {
     "monitoring": "screenshots/Monitoring_Report.pdf"
 }
 
+# S3 upload tuning (the merged PDF can cross the multipart threshold)
+UPLOAD_WORKERS = 8
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_CONCURRENCY = 10
+
 # Final merged file
 FINAL_OUTPUT = "Evosus_Monthly_Audit_Report_Combined.pdf"
 
@@ -44,7 +48,7 @@ MERGE_ORDER = [
 ]
 
 # ================================================================
-# FUNCTION — Run a script & wait for PDF
+# FUNCTION — Run a script & check its PDF
 # ================================================================
 def run_script_and_wait(script_name, expected_pdf):
     print(f"\n▶ Running: {script_name}")
@@ -55,19 +59,12 @@ def run_script_and_wait(script_name, expected_pdf):
         print(f"❌ Script failed: {script_name} — {e}")
         return False
 
-    # Wait for PDF to appear
-    timeout = 180
-    waited = 0
-
-    while waited < timeout:
-        if os.path.exists(expected_pdf):
-            print(f"✅ PDF generated: {expected_pdf}")
-            return True
-
-        time.sleep(1)
-        waited += 1
+    # The script has exited, so its PDF is either there now or never will be
+    if os.path.exists(expected_pdf):
+        print(f"✅ PDF generated: {expected_pdf}")
+        return True
 
-    print(f"❌ TIMEOUT: PDF not generated: {expected_pdf}")
+    print(f"❌ PDF not generated: {expected_pdf}")
     return False
 
 
@@ -75,19 +72,22 @@ def run_script_and_wait(script_name, expected_pdf):
 # FUNCTION — Merge PDFs
 # ================================================================
 def merge_pdfs(pdf_files, output_file):
+    from pypdf import PdfWriter
+
     print("\n🔄 Merging PDFs…")
 
-    merger = PdfMerger()
+    writer = PdfWriter()
 
     for pdf in pdf_files:
         if os.path.exists(pdf):
             print(f"➕ Adding: {pdf}")
-            merger.append(pdf)
+            writer.append(pdf)
         else:
             print(f"⚠️ Missing PDF, skipping: {pdf}")
 
-    merger.write(output_file)
-    merger.close()
+    with open(output_file, "wb") as f:
+        writer.write(f)
+    writer.close()
 
     print(f"\n📄 Combined Audit Report Created: {output_file}")
 
@@ -96,21 +96,35 @@ def merge_pdfs(pdf_files, output_file):
 # FUNCTION — Upload PDFs to S3 using jumpbox IAM role
 # ================================================================
 def upload_reports_to_s3(pdf_files):
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config
+
     print("\n📤 Uploading reports to S3 (using EC2 IAM role)…")
 
-    s3 = boto3.client("s3")  # ← Uses instance profile credentials automatically
+    # ← Uses instance profile credentials automatically; clients are thread-safe
+    s3 = boto3.client("s3", config=Config(max_pool_connections=16))
+    transfer_config = TransferConfig(
+        multipart_threshold=MULTIPART_THRESHOLD,
+        max_concurrency=MULTIPART_CONCURRENCY,
+        use_threads=True
+    )
 
-    for pdf in pdf_files:
+    def upload(pdf):
         if os.path.exists(pdf):
             print(f"⬆️ Uploading: {pdf}")
             s3.upload_file(
                 Filename=pdf,
                 Bucket=S3_BUCKET,
-                Key=os.path.basename(pdf)
+                Key=os.path.basename(pdf),
+                Config=transfer_config
             )
         else:
             print(f"⚠️ Cannot upload (file missing): {pdf}")
 
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+        list(executor.map(upload, pdf_files))
+
     print(f"\n🎉 All available reports uploaded to S3 bucket: {S3_BUCKET}")
 
 
@@ -125,14 +139,20 @@ if __name__ == "__main__":
     print("🚀 MONTHLY AUDIT REPORT GENERATOR STARTED")
     print("==============================\n")
 
-    # Step 1 — Run all scripts in order and collect PDFs
-    for key in MERGE_ORDER:
-        script_name = SCRIPTS[key]
-        pdf_name = PDF_OUTPUTS[key]
+    # Step 1 — Run the report scripts concurrently, then the cover page (it depends on them)
+    report_keys = [key for key in MERGE_ORDER if key != "cover_page"]
+    with ThreadPoolExecutor(max_workers=len(report_keys)) as executor:
+        results = dict(zip(report_keys, executor.map(
+            lambda key: run_script_and_wait(SCRIPTS[key], PDF_OUTPUTS[key]),
+            report_keys
+        )))
 
-        success = run_script_and_wait(script_name, pdf_name)
-        if success:
-            generated_pdfs.append(pdf_name)
+    results["cover_page"] = run_script_and_wait(SCRIPTS["cover_page"], PDF_OUTPUTS["cover_page"])
+
+    # Collect PDFs in merge order
+    for key in MERGE_ORDER:
+        if results[key]:
+            generated_pdfs.append(PDF_OUTPUTS[key])
 
     # Step 2 — Merge all available PDFs
     print("\n==============================")
@@ -1,15 +1,47 @@
 import boto3
+import botocore.session
+from botocore.config import Config
+from botocore.credentials import RefreshableCredentials
+from collections import defaultdict
 from datetime import date
+from functools import lru_cache
+from operator import itemgetter
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.platypus import (
-    SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Frame
+    SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Frame, Flowable
 )
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch
 
+# orjson parses get_findings pages several times faster than botocore's stdlib json;
+# swap it into botocore's JSON body parser when available. That hook is private, so
+# only patch it if it is still there and still has the signature this was written for
+try:
+    import inspect
+    import orjson
+    from botocore.parsers import BaseJSONParser
+
+    _stdlib_parse_body_as_json = getattr(BaseJSONParser, "_parse_body_as_json", None)
+    if _stdlib_parse_body_as_json is not None and \
+            list(inspect.signature(_stdlib_parse_body_as_json).parameters) == ["self", "body_contents"]:
+
+        def _parse_body_as_json(self, body_contents):
+            if not body_contents:
+                return {}
+            try:
+                return orjson.loads(body_contents)
+            except orjson.JSONDecodeError:
+                # Non-JSON error bodies: keep botocore's {"message": body} behaviour
+                return _stdlib_parse_body_as_json(self, body_contents)
+
+        BaseJSONParser._parse_body_as_json = _parse_body_as_json
+except ImportError:
+    pass
+
 REPORT_FILE = "Security_Hub_Report.pdf"
+PDF_WRITE_BUFFER = 1 << 20
 
 # ==========================================
 # AWS CONFIG
@@ -21,6 +53,15 @@ EXTERNAL_ID = None
 
 CLIENT_NAME = "Evosus"
 
+# Each rule's latest status is stored as a small int: 1 if PASSED, 0 for anything else
+# (FAILED, WARNING, NOT_AVAILABLE or a missing status)
+STATUS_FLAGS = {"PASSED": 1}
+
+BOTO_CONFIG = Config(
+    retries={"max_attempts": 10, "mode": "adaptive"},
+    tcp_keepalive=True,
+)
+
 # Previous month (same logic as other reports)
 _today = date.today()
 _prev_month = _today.month - 1 or 12
@@ -31,67 +72,175 @@ REPORT_MONTH_STR = date(_prev_year, _prev_month, 1).strftime("%B %Y")
 # ==========================================
 # STS Assume Role
 # ==========================================
+@lru_cache(maxsize=None)
+def sts_client(region):
+    """STS client on the base credentials, reused by every (re-)assume."""
+    return boto3.client("sts", region_name=region, config=BOTO_CONFIG)
+
+
 def assume_role(role_arn, session_name, external_id=None):
-    sts_client = boto3.client("sts", region_name=AWS_REGION)
+    """boto3 Session for the role whose credentials re-assume it before expiry."""
     args = {"RoleArn": role_arn, "RoleSessionName": session_name}
     if external_id:
         args["ExternalId"] = external_id
-    response = sts_client.assume_role(**args)
-    creds = response["Credentials"]
-    return {
-        "aws_access_key_id": creds["AccessKeyId"],
-        "aws_secret_access_key": creds["SecretAccessKey"],
-        "aws_session_token": creds["SessionToken"],
-    }
 
+    def refresh():
+        creds = sts_client(AWS_REGION).assume_role(**args)["Credentials"]
+        return {
+            "access_key": creds["AccessKeyId"],
+            "secret_key": creds["SecretAccessKey"],
+            "token": creds["SessionToken"],
+            "expiry_time": creds["Expiration"].isoformat(),
+        }
 
-def aws_client(service, session, region=AWS_REGION):
-    return boto3.client(
-        service,
-        region_name=region,
-        aws_access_key_id=session["aws_access_key_id"],
-        aws_secret_access_key=session["aws_secret_access_key"],
-        aws_session_token=session["aws_session_token"],
+    botocore_session = botocore.session.get_session()
+    botocore_session._credentials = RefreshableCredentials.create_from_metadata(
+        metadata=refresh(),
+        refresh_using=refresh,
+        method="sts-assume-role",
     )
+    return boto3.Session(botocore_session=botocore_session, region_name=AWS_REGION)
+
+
+@lru_cache(maxsize=None)
+def aws_client(service, session, region=AWS_REGION):
+    # One client per service/region for the assumed-role session
+    return session.client(service, region_name=region, config=BOTO_CONFIG)
 
 
 # ==========================================
 # Custom PDF with border + header bar + footer inside border
 # ==========================================
+PAGE_CHROME_FORM = "pageChrome"
+
+
+def draw_page_frame(c: canvas.Canvas):
+    # The border/header/footer never change, so they are recorded once as a form
+    # XObject and every page just references it
+    if not c.hasForm(PAGE_CHROME_FORM):
+        c.beginForm(PAGE_CHROME_FORM)
+        draw_page_chrome(c)
+        c.endForm()
+    c.doForm(PAGE_CHROME_FORM)
+
+
+def draw_page_chrome(c: canvas.Canvas):
+    width, height = landscape(A4)
+
+    margin = 25  # same spacing as CC layout
+
+    # Outer border
+    c.setLineWidth(1)
+    c.rect(margin, margin, width - 2 * margin, height - 2 * margin)
+
+    # Dark blue header bar
+    c.setFillColor("#003366")
+    c.rect(margin, height - margin - 35, width - 2 * margin, 35, fill=1)
+
+    # Header Title (white, centered)
+    title_text = (
+        f"Security Hub Compliance Report - {CLIENT_NAME} - {REPORT_MONTH_STR}"
+    )
+    c.setFont("Helvetica-Bold", 14)
+    c.setFillColor(colors.white)
+    c.drawCentredString(width / 2, height - margin - 15, title_text)
+
+    # Footer inside border
+    c.setFont("Helvetica-Oblique", 9)
+    c.setFillColor(colors.grey)
+    c.drawCentredString(
+        width / 2,
+        margin + 8,  # inside border (similar to CC placement)
+        f"Monthly Audit Report - {REPORT_MONTH_STR}",
+    )
+
+
 class BorderPDF(SimpleDocTemplate):
     def __init__(self, filename, **kwargs):
         super().__init__(filename, **kwargs)
 
     def afterPage(self):
-        c: canvas.Canvas = self.canv
-        width, height = landscape(A4)
+        draw_page_frame(self.canv)
+
+
+# ==========================================
+# PDF styles (built once at import)
+# ==========================================
+class TextLine(Flowable):
+    """Single line of plain text in a ParagraphStyle's font, without Paragraph's markup parsing/wrapping."""
+
+    def __init__(self, text, style):
+        super().__init__()
+        self.text = text
+        self.style = style
+
+    def wrap(self, availWidth, availHeight):
+        return availWidth, self.style.leading
+
+    def getSpaceAfter(self):
+        return self.style.spaceAfter
+
+    def draw(self):
+        self.canv.setFont(self.style.fontName, self.style.fontSize)
+        self.canv.setFillColor(self.style.textColor)
+        self.canv.drawString(0, self.style.leading - self.style.fontSize, self.text)
 
-        margin = 25  # same spacing as CC layout
 
-        # Outer border
-        c.setLineWidth(1)
-        c.rect(margin, margin, width - 2 * margin, height - 2 * margin)
+DESC_TEXT = (
+    "Track your cloud security posture with a summary security score and "
+    "per-standard compliance scores. This report shows complete, unfiltered Security Hub data."
+)
+DESC_STYLE = ParagraphStyle(
+    "Description",
+    fontName="Helvetica",
+    fontSize=12,
+    textColor=colors.black,
+    spaceAfter=20,
+)
+CONTROLS_STYLE = ParagraphStyle(
+    "ControlsStyle",
+    fontName="Helvetica",
+    fontSize=14,
+    textColor=colors.black,
+    spaceAfter=20,
+)
+
+
+def _score_style(color):
+    return ParagraphStyle(
+        "ScoreStyle",
+        fontName="Helvetica-Bold",
+        fontSize=36,
+        textColor=color,
+        spaceAfter=12,
+    )
 
-        # Dark blue header bar
-        c.setFillColor("#003366")
-        c.rect(margin, height - margin - 35, width - 2 * margin, 35, fill=1)
 
-        # Header Title (white, centered)
-        title_text = (
-            f"Security Hub Compliance Report - {CLIENT_NAME} - {REPORT_MONTH_STR}"
-        )
-        c.setFont("Helvetica-Bold", 14)
-        c.setFillColor(colors.white)
-        c.drawCentredString(width / 2, height - margin - 15, title_text)
+# Keyed by (score >= 80, score >= 70)
+SCORE_STYLES = {
+    (True, True): _score_style("#34a853"),
+    (False, True): _score_style("#f9ab00"),
+    (False, False): _score_style("#ea4335"),
+}
+
+TABLE_STYLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#003366")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, 0), 11),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.whitesmoke, colors.lightgrey]),
+    ]
+)
 
-        # Footer inside border
-        c.setFont("Helvetica-Oblique", 9)
-        c.setFillColor(colors.grey)
-        c.drawCentredString(
-            width / 2,
-            margin + 8,  # inside border (similar to CC placement)
-            f"Monthly Audit Report - {REPORT_MONTH_STR}",
-        )
+STANDARD_DISPLAY_NAMES = {
+    "cis-aws-foundations-benchmark": "CIS AWS Foundations Benchmark v3.0.0",
+    "pci-dss": "PCI DSS v4.0.1",
+    "aws-foundational-security-best-practices": "AWS Foundational Security Best Practices v1.0.0",
+}
 
 
 # ==========================================
@@ -99,70 +248,30 @@ class BorderPDF(SimpleDocTemplate):
 # ==========================================
 def generate_pdf(per_standard_stats, overall_score, total_passed, total_controls, file_name):
 
-    doc = BorderPDF(file_name, pagesize=landscape(A4))
-    styles = getSampleStyleSheet()
     elements = []
 
     # Add top spacing (because header bar takes space)
     elements.append(Spacer(1, 50))
 
-    desc_text = (
-        "Track your cloud security posture with a summary security score and "
-        "per-standard compliance scores. This report shows complete, unfiltered Security Hub data."
-    )
-    desc_style = ParagraphStyle(
-        "Description",
-        fontName="Helvetica",
-        fontSize=12,
-        textColor=colors.black,
-        spaceAfter=20,
-    )
-    elements.append(Paragraph(desc_text, desc_style))
-
-    # Score color logic
-    if overall_score >= 80:
-        color = "#34a853"
-    elif overall_score >= 70:
-        color = "#f9ab00"
-    else:
-        color = "#ea4335"
+    elements.append(Paragraph(DESC_TEXT, DESC_STYLE))
 
-    score_style = ParagraphStyle(
-        "ScoreStyle",
-        fontName="Helvetica-Bold",
-        fontSize=36,
-        textColor=color,
-        spaceAfter=12,
-    )
-    score_para = Paragraph(f"{overall_score}%", score_style)
+    # Score color: (>= 80, >= 70) -> style
+    score_style = SCORE_STYLES[(overall_score >= 80, overall_score >= 70)]
+    score_para = TextLine(f"{overall_score}%", score_style)
     elements.append(score_para)
 
     elements.append(Spacer(1, 20))
 
-    controls_style = ParagraphStyle(
-        "ControlsStyle",
-        fontName="Helvetica",
-        fontSize=14,
-        textColor=colors.black,
-        spaceAfter=20,
-    )
-    controls_para = Paragraph(f"{total_passed} of {total_controls} controls passed", controls_style)
+    controls_para = TextLine(f"{total_passed} of {total_controls} controls passed", CONTROLS_STYLE)
     elements.append(controls_para)
 
-    # Table content
-    table_data = [["Standard", "Passed", "Failed", "Score (%)"]]
-
-    standard_display_names = {
-        "cis-aws-foundations-benchmark": "CIS AWS Foundations Benchmark v3.0.0",
-        "pci-dss": "PCI DSS v4.0.1",
-        "aws-foundational-security-best-practices": "AWS Foundational Security Best Practices v1.0.0",
-    }
-
-    for standard, s in per_standard_stats.items():
-        display_name = standard_display_names.get(standard, standard)
-        table_data.append([display_name, s["passed"], s["failed"], s["score"]])
-
-    table_data[1:] = sorted(table_data[1:], key=lambda x: x[0])
+    # Table content, sorted by display name
+    rows = [
+        [STANDARD_DISPLAY_NAMES.get(standard, standard), s["passed"], s["failed"], s["score"]]
+        for standard, s in per_standard_stats.items()
+    ]
+    rows.sort(key=itemgetter(0))
+    table_data = [["Standard", "Passed", "Failed", "Score (%)"], *rows]
 
     table = Table(
         table_data,
@@ -170,73 +279,113 @@ def generate_pdf(per_standard_stats, overall_score, total_passed, total_controls
         colWidths=[4 * inch, 1 * inch, 1 * inch, 1 * inch],
     )
 
-    table_style = TableStyle(
-        [
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#003366")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("FONTSIZE", (0, 0), (-1, 0), 11),
-            ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.whitesmoke, colors.lightgrey]),
-        ]
-    )
-
-    table.setStyle(table_style)
+    table.setStyle(TABLE_STYLE)
     elements.append(table)
 
-    doc.build(elements)
+    # One large buffered write instead of many small ones
+    with open(file_name, "wb", buffering=PDF_WRITE_BUFFER) as f:
+        if not draw_single_page(elements, f):
+            # Too many standards for one page: let Platypus paginate
+            BorderPDF(f, pagesize=landscape(A4)).build(elements)
     print(f"📄 Security Hub Report generated: {file_name}")
 
 
+def draw_single_page(elements, out):
+    """Draw the flowables straight onto one canvas; False (nothing written) if they don't fit."""
+    width, height = landscape(A4)
+
+    # Same content frame SimpleDocTemplate would use: 1 inch margins + 6pt frame padding
+    frame_x = inch + 6
+    frame_width = width - 2 * (inch + 6)
+    frame_height = height - 2 * (inch + 6)
+
+    placements = []
+    y = height - inch - 6
+    for flowable in elements:
+        w, h = flowable.wrap(frame_width, frame_height)
+        y -= h
+        placements.append((flowable, w, y))
+        y -= flowable.getSpaceAfter()
+
+    if y + flowable.getSpaceAfter() < inch + 6:
+        return False
+
+    c = canvas.Canvas(out, pagesize=landscape(A4))
+    for flowable, w, y in placements:
+        x = frame_x + (frame_width - w) / 2 if getattr(flowable, "hAlign", "LEFT") == "CENTER" else frame_x
+        flowable.drawOn(c, x, y)
+    draw_page_frame(c)
+    c.showPage()
+    c.save()
+    return True
+
+
 # ==========================================
 # Fetch Security Hub Data
 # ==========================================
-def fetch_security_scores(session, region_name=None, accountId=None):
-    region = region_name or AWS_REGION
-    client = aws_client("securityhub", session, region)
-
-    if not accountId:
-        accountId = aws_client("sts", session).get_caller_identity()["Account"]
-
+def fetch_findings(client, accountId):
+    """{standard: (passed, controls)} for the account's active control findings; the last finding per rule wins."""
     paginator = client.get_paginator("get_findings").paginate(
         Filters={
             "AwsAccountId": [{"Value": accountId, "Comparison": "EQUALS"}],
             "ProductName": [{"Value": "Security Hub", "Comparison": "EQUALS"}],
             "RecordState": [{"Value": "ACTIVE", "Comparison": "EQUALS"}],
+            # Let Security Hub drop suppressed findings instead of paging them down
+            "WorkflowStatus": [{"Value": "SUPPRESSED", "Comparison": "NOT_EQUALS"}],
         },
-        MaxResults=100,
+        PaginationConfig={"PageSize": 100},
     )
 
-    standardsDict = {}
+    # Counts are kept up to date while streaming; the per-rule flags are only
+    # needed to undo a rule's previous status when a later finding overrides it
+    ruleFlags = defaultdict(dict)
+    passedCounts = defaultdict(int)
+    controlNames = {}  # standards ARN -> short name, parsed once per distinct ARN
 
     for page in paginator:
         for finding in page["Findings"]:
-            if (
-                "Compliance" in finding
-                and "ProductFields" in finding
-                and finding["RecordState"] == "ACTIVE"
-                and finding.get("Workflow", {}).get("Status") != "SUPPRESSED"
-            ):
-                status = finding["Compliance"].get("Status", "UNKNOWN")
+            try:
+                compliance = finding["Compliance"]
                 prodFields = finding["ProductFields"]
-                control = prodFields.get("StandardsArn", prodFields.get("StandardsGuideArn", "Unknown"))
-                rule = prodFields.get("ControlId", prodFields.get("RuleId", "UNKNOWN"))
+            except KeyError:
+                continue
+            get_field = prodFields.get
 
-                parts = control.split("/")
-                controlName = parts[1] if len(parts) > 1 else control
+            control = get_field("StandardsArn")
+            if control is None:
+                control = get_field("StandardsGuideArn", "Unknown")
+            rule = get_field("ControlId")
+            if rule is None:
+                rule = get_field("RuleId", "UNKNOWN")
 
-                standardsDict.setdefault(controlName, {})[rule] = status
+            controlName = controlNames.get(control)
+            if controlName is None:
+                _, sep, rest = control.partition("/")
+                controlName = controlNames[control] = rest.partition("/")[0] if sep else control
+
+            rules = ruleFlags[controlName]
+            passed = STATUS_FLAGS.get(compliance.get("Status"), 0)
+            previous = rules.get(rule, 0)
+            rules[rule] = passed
+            passedCounts[controlName] += passed - previous
+
+    return {standard: (passedCounts[standard], len(rules)) for standard, rules in ruleFlags.items()}
+
+
+def fetch_security_scores(session, region_name=None, accountId=None):
+    region = region_name or AWS_REGION
+    client = aws_client("securityhub", session, region)
+
+    if not accountId:
+        accountId = aws_client("sts", session).get_caller_identity()["Account"]
 
     per_standard_stats = {}
     total_controls = 0
     total_passed = 0
 
-    for standard, controls in standardsDict.items():
-        passed = sum(1 for k in controls if controls[k] == "PASSED")
-        failed = len(controls) - passed
-        score = round(passed / len(controls) * 100) if controls else 0
+    for standard, (passed, controls) in fetch_findings(client, accountId).items():
+        failed = controls - passed
+        score = round(passed / controls * 100) if controls else 0
 
         per_standard_stats[standard] = {
             "passed": passed,
@@ -244,7 +393,7 @@ def fetch_security_scores(session, region_name=None, accountId=None):
             "score": score,
         }
 
-        total_controls += len(controls)
+        total_controls += controls
         total_passed += passed
 
     overall_score = round((total_passed / total_controls) * 100) if total_controls else 0
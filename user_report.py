@@ -1,9 +1,19 @@
 import boto3
+import csv
+import sys
+from botocore.config import Config
+import datetime
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
+from functools import lru_cache
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, LongTable, TableStyle, Spacer
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch
 
@@ -18,6 +28,8 @@ EXTERNAL_ID = None   # Only if required
 
 EXCLUDE_DOMAINS = ["epiuse.com", "afonza.com"]
 REPORT_FILE = "SSO_User_List_Evosus.pdf"
+CSV_REPORT_FILE = "SSO_User_List_Evosus.csv"
+WRITE_BUFFER = 1 << 20
 CLIENT_NAME = "Evosus"
 
 # Previous month (same logic as other reports)
@@ -25,84 +37,142 @@ _today = date.today()
 _prev_month = _today.month - 1 or 12
 _prev_year = _today.year if _today.month != 1 else _today.year - 1
 REPORT_MONTH_STR = date(_prev_year, _prev_month, 1).strftime("%B %Y")
+
+# Assumed-role credentials are reused across runs until shortly before expiry
+CREDS_CACHE_DIR = os.path.expanduser("~/.cache/audit-automation")
+CREDS_EXPIRY_MARGIN = datetime.timedelta(minutes=5)
+
+BOTO_CONFIG = Config(max_pool_connections=50, retries={"max_attempts": 10, "mode": "adaptive"})
 # ==========================================
 
 
 # ==========================================
 # STS Assume Role
 # ==========================================
+def _load_cached_creds(path):
+    try:
+        with open(path) as f:
+            creds = json.load(f)
+        expiration = datetime.datetime.fromisoformat(creds["Expiration"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    if expiration - CREDS_EXPIRY_MARGIN <= datetime.datetime.now(datetime.timezone.utc):
+        return None
+    return creds
+
+
+def _save_cached_creds(path, creds):
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=CREDS_CACHE_DIR)  # created 0600
+        with os.fdopen(fd, "w") as f:
+            json.dump(creds, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Could not cache AWS credentials: {e}")
+
+
 def assume_role(role_arn, session_name, external_id=None):
-    sts_client = boto3.client("sts", region_name=AWS_REGION)
-
-    if external_id:
-        resp = sts_client.assume_role(
-            RoleArn=role_arn,
-            RoleSessionName=session_name,
-            ExternalId=external_id
-        )
-    else:
-        resp = sts_client.assume_role(
-            RoleArn=role_arn,
-            RoleSessionName=session_name
-        )
-
-    creds = resp["Credentials"]
-    return {
-        "aws_access_key_id": creds["AccessKeyId"],
-        "aws_secret_access_key": creds["SecretAccessKey"],
-        "aws_session_token": creds["SessionToken"]
-    }
+    cache_key = hashlib.sha1(f"{role_arn}|{session_name}|{external_id or ''}".encode()).hexdigest()
+    cache_path = os.path.join(CREDS_CACHE_DIR, f"sts-{cache_key}.json")
+    os.makedirs(CREDS_CACHE_DIR, mode=0o700, exist_ok=True)
+
+    # Hold a lock while checking/refreshing so overlapping runs of this script don't
+    # both call STS (the cache is per session name, so other reports use their own)
+    with open(f"{cache_path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        creds = _load_cached_creds(cache_path)
+        if creds is None:
+            sts_client = boto3.client("sts", region_name=AWS_REGION)
+
+            if external_id:
+                resp = sts_client.assume_role(
+                    RoleArn=role_arn,
+                    RoleSessionName=session_name,
+                    ExternalId=external_id
+                )
+            else:
+                resp = sts_client.assume_role(
+                    RoleArn=role_arn,
+                    RoleSessionName=session_name
+                )
+
+            creds = dict(resp["Credentials"], Expiration=resp["Credentials"]["Expiration"].isoformat())
+            _save_cached_creds(cache_path, creds)
+
+    # One session for every client, so they share credentials and config
+    return boto3.Session(
+        aws_access_key_id=creds["AccessKeyId"],
+        aws_secret_access_key=creds["SecretAccessKey"],
+        aws_session_token=creds["SessionToken"],
+        region_name=AWS_REGION
+    )
 
 
 # ==========================================
 # Client helper using assumed role
 # ==========================================
+@lru_cache(maxsize=None)
 def aws_client(service, session):
-    return boto3.client(
-        service,
-        region_name=AWS_REGION,
-        aws_access_key_id=session["aws_access_key_id"],
-        aws_secret_access_key=session["aws_secret_access_key"],
-        aws_session_token=session["aws_session_token"],
-    )
+    # One client per service for the assumed-role session
+    return session.client(service, region_name=AWS_REGION, config=BOTO_CONFIG)
 
 
 # ==========================================
 # PDF Class (border + blue header + footer inside border)
 # ==========================================
+# Page geometry and text never change between pages, so compute them once
+PAGE_WIDTH, PAGE_HEIGHT = landscape(A4)
+PAGE_MARGIN = 25
+HEADER_HEIGHT = 35
+HEADER_COLOR = colors.HexColor("#003366")
+HEADER_TEXT = f"SSO User List - {CLIENT_NAME} - {REPORT_MONTH_STR}"
+FOOTER_TEXT = f"Monthly Audit Report - {REPORT_MONTH_STR}"
+BORDER_WIDTH = PAGE_WIDTH - 2 * PAGE_MARGIN
+BORDER_HEIGHT = PAGE_HEIGHT - 2 * PAGE_MARGIN
+HEADER_Y = PAGE_HEIGHT - PAGE_MARGIN - HEADER_HEIGHT
+HEADER_TEXT_Y = PAGE_HEIGHT - PAGE_MARGIN - 15
+FOOTER_TEXT_Y = PAGE_MARGIN + 8  # inside border, similar to other reports
+CENTER_X = PAGE_WIDTH / 2
+PAGE_CHROME_FORM = "pageChrome"
+
+
 class BorderPDF(SimpleDocTemplate):
     """Custom PDF class with border, header bar, and footer."""
     def __init__(self, filename, **kwargs):
         super().__init__(filename, **kwargs)
 
     def afterPage(self):
+        # The border/header/footer never change, so they are recorded once as a form
+        # XObject and every page just references it
         c: canvas.Canvas = self.canv
-        width, height = landscape(A4)
-
-        margin = 25
+        if not c.hasForm(PAGE_CHROME_FORM):
+            c.beginForm(PAGE_CHROME_FORM)
+            self.draw_page_chrome(c)
+            c.endForm()
+        c.doForm(PAGE_CHROME_FORM)
+
+    @staticmethod
+    def draw_page_chrome(c: canvas.Canvas):
         c.setLineWidth(1)
 
         # Outer border
-        c.rect(margin, margin, width - 2 * margin, height - 2 * margin)
+        c.rect(PAGE_MARGIN, PAGE_MARGIN, BORDER_WIDTH, BORDER_HEIGHT)
 
         # Dark blue header bar
-        c.setFillColor("#003366")
-        c.rect(margin, height - margin - 35, width - 2 * margin, 35, fill=1)
+        c.setFillColor(HEADER_COLOR)
+        c.rect(PAGE_MARGIN, HEADER_Y, BORDER_WIDTH, HEADER_HEIGHT, fill=1)
 
         # Header text (white, centered)
-        header_text = f"SSO User List - {CLIENT_NAME} - {REPORT_MONTH_STR}"
         c.setFont("Helvetica-Bold", 14)
         c.setFillColor(colors.white)
-        c.drawCentredString(width / 2, height - margin - 15, header_text)
+        c.drawCentredString(CENTER_X, HEADER_TEXT_Y, HEADER_TEXT)
 
         # Footer inside border
         c.setFont("Helvetica-Oblique", 9)
         c.setFillColor(colors.grey)
-        c.drawCentredString(
-            width / 2,
-            margin + 8,  # inside border, similar to other reports
-            f"Monthly Audit Report - {REPORT_MONTH_STR}",
-        )
+        c.drawCentredString(CENTER_X, FOOTER_TEXT_Y, FOOTER_TEXT)
 
 
 # ==========================================
@@ -119,76 +189,126 @@ def get_identity_store_id(session):
     return instances["Instances"][0]["IdentityStoreId"]
 
 
-def list_all_users(session, identity_store_id, exclude_domains=None):
-    """List all users and exclude emails from unwanted domains."""
-    identity = aws_client("identitystore", session)
+def primary_email(emails):
+    """Value of the primary email, or "-"."""
+    for e in emails:
+        if e.get("Primary"):
+            return e["Value"]
+    return "-"
 
-    paginator = identity.get_paginator("list_users")
-    page_iterator = paginator.paginate(
-        IdentityStoreId=identity_store_id,
-        PaginationConfig={"PageSize": 50}
-    )
 
-    exclude_domains = [d.lower() for d in (exclude_domains or [])]
-    users = []
+def iter_user_pages(identity, identity_store_id):
+    """Yield list_users pages, requesting page n+1 while the caller processes page n."""
+    kwargs = {"IdentityStoreId": identity_store_id, "MaxResults": 100}  # service maximum
 
-    for page in page_iterator:
+    # Pages are chained by NextToken, so one request in flight ahead of the caller is the most possible
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(identity.list_users, **kwargs)
+        while future:
+            page = future.result()
+            next_token = page.get("NextToken")
+            future = executor.submit(identity.list_users, **kwargs, NextToken=next_token) if next_token else None
+            yield page
+
+
+def iter_users(session, identity_store_id, exclude_domains=None):
+    """Yield (username, display name, email) per user, skipping emails from unwanted domains."""
+    identity = aws_client("identitystore", session)
+
+    # One set probe on the email's domain checks every excluded domain at once
+    excluded = frozenset(d.lower() for d in exclude_domains or ())
+
+    for page in iter_user_pages(identity, identity_store_id):
         for user in page.get("Users", []):
-            username = user.get("UserName", "-")
-            displayname = user.get("DisplayName", "-")
-            email = next((e["Value"] for e in user.get("Emails", []) if e.get("Primary")), "-")
+            get = user.get
+            username = get("UserName", "-")
+            displayname = get("DisplayName", "-")
+            email = primary_email(get("Emails", ()))
 
-            if email and any(email.lower().endswith(f"@{d}") for d in exclude_domains):
+            if email.rpartition("@")[2].lower() in excluded:
                 continue
 
-            users.append([username, displayname, email])
+            yield username, displayname, email
 
-    return users
+
+def list_all_users(session, identity_store_id, exclude_domains=None):
+    """List all users and exclude emails from unwanted domains."""
+    return list(iter_users(session, identity_store_id, exclude_domains))
 
 
 # ==========================================
 # PDF Generation
 # ==========================================
+TABLE_HEADER = ("Username", "Display Name", "Email")
+
+# Whole-table range commands (built once): ReportLab applies each to its cell range,
+# no per-row style entries
+TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#003366")),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, 0), 11),
+    ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+    ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.whitesmoke, colors.lightgrey]),
+])
+
+
 def generate_pdf_report(users, file_name):
     """Generate PDF report."""
-    doc = BorderPDF(file_name, pagesize=landscape(A4))
-    styles = getSampleStyleSheet()
     elements = []
 
     # Spacer to account for header bar area
     elements.append(Spacer(1, 50))
 
-    # Table
-    data = [["Username", "Display Name", "Email"]] + users
-    table = Table(data, repeatRows=1, colWidths=[2.5 * inch, 3 * inch, 3 * inch])
-
-    table_style = TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#003366")),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, 0), 11),
-        ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.whitesmoke, colors.lightgrey]),
-    ])
-    table.setStyle(table_style)
+    # Table: header row followed by the users (the caller's list is left untouched)
+    data = [TABLE_HEADER, *users]
+    # LongTable lays out long multi-page user lists in much less time than Table
+    table = LongTable(data, repeatRows=1, splitByRow=1, colWidths=[2.5 * inch, 3 * inch, 3 * inch])
+
+    table.setStyle(TABLE_STYLE)
 
     elements.append(table)
 
-    doc.build(elements)
+    # ReportLab writes straight into the open file; a large buffer keeps writes few and big
+    with open(file_name, "wb", buffering=WRITE_BUFFER) as f:
+        BorderPDF(f, pagesize=landscape(A4)).build(elements)
     print(f"📄 PDF generated: {file_name}")
 
 
+def generate_csv_report(users, file_name):
+    """Write users to CSV row by row as they are listed; returns the row count."""
+    count = 0
+    with open(file_name, "w", newline="", buffering=WRITE_BUFFER) as f:
+        writer = csv.writer(f)
+        writer.writerow(TABLE_HEADER)
+        for row in users:
+            writer.writerow(row)
+            count += 1
+
+    print(f"📄 CSV generated: {file_name}")
+    return count
+
+
 # ==========================================
 # Main Entry
 # ==========================================
-def main():
+def main(report_format="pdf"):
     try:
         print("🔄 Assuming IAM Role for Identity Center User List...")
         session = assume_role(ROLE_ARN, SESSION_NAME, EXTERNAL_ID)
 
         identity_store_id = get_identity_store_id(session)
+
+        if report_format == "csv":
+            # Streams straight from the paginator; no user list or PDF layout
+            if not generate_csv_report(
+                iter_users(session, identity_store_id, exclude_domains=EXCLUDE_DOMAINS), CSV_REPORT_FILE
+            ):
+                print("⚠️ No users found after filtering excluded domains.")
+            return
+
         users = list_all_users(session, identity_store_id, exclude_domains=EXCLUDE_DOMAINS)
 
         if not users:
@@ -202,4 +322,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main("csv" if "--format=csv" in sys.argv[1:] else "pdf")
\ No newline at end of file